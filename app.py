@@ -1,20 +1,16 @@
 import asyncio
 import atexit
-import csv
 import json
 import logging
+import multiprocessing
 import os
 import threading
 import time
 import uuid
 from datetime import datetime
 from functools import wraps
-from io import BytesIO, StringIO
 import requests
 
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
 import numpy as np
 from dotenv import load_dotenv
 from flask import (
@@ -26,6 +22,7 @@ from flask import (
     request,
     send_from_directory,
     session,
+    stream_template,
     url_for,
 )
 from flask_bcrypt import Bcrypt
@@ -33,17 +30,57 @@ from openai import OpenAI
 from peewee import IntegrityError, OperationalError
 from werkzeug.serving import is_running_from_reloader
 
+from balance_history import HISTORY_POINTS, MAX_HISTORY_POINTS, balance_history
+from charts import (
+    CHART_FORMATS,
+    ChartCache,
+    chart_key,
+    invest_series,
+    overview_chart_data,
+    overview_series,
+    parse_chart_variant,
+    render_chart,
+    warm_up_charts,
+)
+from csv_columns import read_columns
+from dashboard import DashboardData
+from executor import PoolTimeout, ProcessPool, SimulationExecutor
+from import_jobs import enqueue_import, import_state, job_status, process_import_jobs
+from incremental import IncrementalSimulator
 from mcp_server.client import MCPClient
 from model import (
     ChatHistory,
     DataInvestment,
     DataOverview,
-    DataTransaction,
+    ImportJob,
     User,
     create_tables,
     database,
+    refresh_portfolio_summary,
+)
+from simulation import expand_grid, goal_seek, simulate_batch, simulate_monte_carlo, simulate_retirement
+from serialization import (
+    BINARY_MIMETYPE,
+    GZIP_MIN_SIZE,
+    RESPONSE_FORMATS,
+    compress,
+    encode_binary,
+    encode_json,
+    encode_results,
+)
+from simulation_cache import SimulationCache
+from transactions import MAX_PAGE_SIZE, PAGE_SIZE, TransactionPage
+from uploads import (
+    INVEST_COLUMNS,
+    INVEST_TEXT_COLUMNS,
+    OVERVIEW_COLUMNS,
+    TRANSACTION_COLUMNS,
+    TRANSACTION_TEXT_COLUMNS,
+    import_transactions,
+    read_csv,
+    upsert_investments,
+    upsert_overview,
 )
-from simulation import simulate_retirement
 
 
 ### Logging Configuration
@@ -92,8 +129,12 @@ client = OpenAI(
 
 
 ### MCP Client Configuration
+# Worker processes spawned by the simulation executor re-import the main module, so they skip the MCP client
+IS_WORKER_PROCESS = multiprocessing.parent_process() is not None
+
 mcp_client = MCPClient()
-mcp_client.start_background_loop()
+if not IS_WORKER_PROCESS:
+    mcp_client.start_background_loop()
 
 def init_mcp_client():
     try:
@@ -107,12 +148,12 @@ def init_mcp_client():
     except Exception as e:
         logging.info(f"Failed to initialize MCP client: {e}")
 
-if not is_running_from_reloader():
+if not is_running_from_reloader() and not IS_WORKER_PROCESS:
     threading.Timer(5.0, init_mcp_client).start()
 
 @atexit.register
 def cleanup_resources():
-    if mcp_client:
+    if mcp_client and not IS_WORKER_PROCESS:
         logging.info("Cleaning up MCP client...")
         try:
             def cleanup_background():
@@ -130,8 +171,84 @@ def cleanup_resources():
             logging.error(f"Error during cleanup: {e}")
 
 
+### Simulation Executor Configuration
+SIMULATION_WORKERS = int(os.getenv("SIMULATION_WORKERS", os.cpu_count() or 1))
+PARALLEL_MIN_PATHS = 20000
+PARALLEL_MIN_SCENARIOS = 2000
+simulation_executor = SimulationExecutor(max_workers=SIMULATION_WORKERS) if SIMULATION_WORKERS > 0 else None
+
+incremental_simulator = IncrementalSimulator()
+simulation_cache = SimulationCache(
+    max_entries=int(os.getenv("SIMULATION_CACHE_SIZE", 1024)),
+    ttl=int(os.getenv("SIMULATION_CACHE_TTL", 3600)),
+)
+
+@atexit.register
+def shutdown_simulation_executor():
+    if simulation_executor:
+        simulation_executor.shutdown()
+
+
+### Dashboard Data Configuration
+dashboard_data = DashboardData(ttl=float(os.getenv("DASHBOARD_DATA_TTL", 5)))
+balance_history_cache = ChartCache(max_bytes=int(os.getenv("BALANCE_HISTORY_CACHE_MAX_BYTES", 16 * 1024 * 1024)))
+
+
+### Chart Renderer Configuration
+CHART_WORKERS = int(os.getenv("CHART_WORKERS", os.cpu_count() or 1))
+CHART_RENDER_TIMEOUT = float(os.getenv("CHART_RENDER_TIMEOUT", 10))
+chart_pool = ProcessPool(max_workers=CHART_WORKERS, initializer=warm_up_charts) if CHART_WORKERS > 0 else None
+chart_cache = ChartCache(max_bytes=int(os.getenv("CHART_CACHE_MAX_BYTES", 32 * 1024 * 1024)))
+
+# Charts rendered in this process (CHART_WORKERS=0, or the pool timing out) skip the cold start too, and
+# Gunicorn workers inherit the warmed state from the preloaded app
+if not IS_WORKER_PROCESS:
+    warm_up_charts()
+
+def start_chart_workers():
+    # The pool must be started after Gunicorn forks, so this runs from its post_fork hook or on the first request
+    if chart_pool:
+        chart_pool.start()
+
+@atexit.register
+def shutdown_chart_pool():
+    if chart_pool:
+        chart_pool.shutdown()
+
+
+### Import Job Configuration
+# Transaction uploads are spooled to IMPORT_SPOOL_DIR and imported by this many worker processes; 0 imports
+# them inside the request. SQLite has a single writer, so more than one worker rarely helps.
+IMPORT_WORKERS = int(os.getenv("IMPORT_WORKERS", 1))
+IMPORT_SPOOL_DIR = os.getenv("IMPORT_SPOOL_DIR", "import_spool")
+import_pool = ProcessPool(max_workers=IMPORT_WORKERS) if IMPORT_WORKERS > 0 else None
+import_workers_started = False
+
+def dispatch_import_jobs():
+    # Each task drains the queue, so when every slot is taken a task that has not started yet will see the job
+    try:
+        import_pool.submit(process_import_jobs, deadline=time.monotonic())
+    except PoolTimeout:
+        pass
+
+def start_import_workers():
+    # Like the chart pool, started after Gunicorn forks; picks up jobs queued or interrupted before a restart
+    global import_workers_started
+    if import_pool and not import_workers_started:
+        import_workers_started = True
+        dispatch_import_jobs()
+
+@atexit.register
+def shutdown_import_pool():
+    if import_pool:
+        import_pool.shutdown()
+
+
 ### Flask Application Configuration
 REQUEST_TIMEOUT = 30
+SIMULATION_ENGINE = os.getenv("SIMULATION_ENGINE", "python")
+MAX_BATCH_SCENARIOS = 10000
+MAX_MONTE_CARLO_PATHS = 100000
 app = Flask(__name__)
 app.secret_key = os.getenv("FLASK_SECRET_KEY")
 bcrypt = Bcrypt(app)
@@ -139,6 +256,8 @@ bcrypt = Bcrypt(app)
 
 @app.before_request
 def before_request():
+    start_chart_workers()
+    start_import_workers()
     if request.path != '/send_message':
         request.environ['REQUEST_TIMEOUT'] = REQUEST_TIMEOUT
     get_db()
@@ -333,47 +452,163 @@ def logout():
     return redirect(url_for("welcome"))
 
 
+def parse_time_budget(data):
+    time_budget = float(data.get("time_budget", REQUEST_TIMEOUT))
+    if time_budget <= 0:
+        raise ValueError("Time budget must be positive")
+    return min(time_budget, REQUEST_TIMEOUT)
+
+
+def parse_simulation_params(data):
+    return {
+        "current_age": int(data.get("current_age", 30)),
+        "retirement_age": int(data.get("retirement_age", 65)),
+        "monthly_income": float(data.get("monthly_income", 5000)),
+        "monthly_expenses": float(data.get("monthly_expenses", 3000)),
+        "monthly_savings": float(data.get("monthly_savings", 1000)),
+        "investment_strategy": data.get("investment_strategy", "balanced"),
+        "investment_increase": float(data.get("investment_increase", 0)),
+        "career_switch_impact": float(data.get("career_switch_impact", 0)),
+        "purchase_amount": float(data.get("purchase_amount", 0)),
+        "career_switch_age": int(data.get("career_switch_age", 0)),
+        "purchase_age": int(data.get("purchase_age", 0)),
+        "retirement_investment_strategy": data.get("retirement_investment_strategy", "conservative"),
+    }
+
+
+def parse_response_format(data):
+    # Opt in with {"format": ...} or ?format=...; clients that only accept octet-stream get binary
+    response_format = data.get("format") or request.args.get("format")
+    if response_format is None:
+        response_format = "binary" if request.accept_mimetypes.best == BINARY_MIMETYPE else "json"
+    if response_format not in RESPONSE_FORMATS:
+        raise ValueError(f"Response format must be one of {', '.join(RESPONSE_FORMATS)}")
+    return response_format
+
+
+def encoded_response(body, mimetype):
+    response = Response(body, mimetype=mimetype)
+    response.vary.add("Accept-Encoding")
+    if len(body) >= GZIP_MIN_SIZE and request.accept_encodings["gzip"] > 0:
+        response.set_data(compress(body))
+        response.content_encoding = "gzip"
+    return response
+
+
 @app.route("/run_simulation", methods=["POST"])
 @login_required
 def run_simulation():
     try:
         data = request.get_json()
-
-        current_age = int(data.get("current_age", 30))
-        retirement_age = int(data.get("retirement_age", 65))
-        monthly_income = float(data.get("monthly_income", 5000))
-        monthly_expenses = float(data.get("monthly_expenses", 3000))
-        monthly_savings = float(data.get("monthly_savings", 1000))
-        investment_strategy = data.get("investment_strategy", "balanced")
-        retirement_investment_strategy = data.get("retirement_investment_strategy", "conservative")
-        investment_increase = float(data.get("investment_increase", 0))
-        career_switch_impact = float(data.get("career_switch_impact", 0))
-        career_switch_age = int(data.get("career_switch_age", 0))
-        purchase_amount = float(data.get("purchase_amount", 0))
-        purchase_age = int(data.get("purchase_age", 0))
-
-        results = simulate_retirement(
-            current_age, 
-            retirement_age, 
-            monthly_income, 
-            monthly_expenses, 
-            monthly_savings, 
-            investment_strategy, 
-            investment_increase, 
-            career_switch_impact, 
-            purchase_amount,
-            career_switch_age,
-            purchase_age,
-            retirement_investment_strategy
-        )
-        return jsonify(results)
+        params = parse_simulation_params(data)
+
+        if data.get("mode") == "monte_carlo":
+            n_paths = int(data.get("n_paths", 10000))
+            if n_paths > MAX_MONTE_CARLO_PATHS:
+                return jsonify({"error": f"Number of paths cannot exceed {MAX_MONTE_CARLO_PATHS}"}), 400
+            seed = data.get("seed")
+            seed = int(seed) if seed is not None else None
+            if simulation_executor and n_paths >= PARALLEL_MIN_PATHS:
+                results = simulation_executor.monte_carlo(
+                    params, n_paths, seed=seed, time_budget=parse_time_budget(data)
+                )
+            else:
+                results = simulate_monte_carlo(**params, n_paths=n_paths, seed=seed)
+            return encoded_response(encode_json(results), "application/json")
+
+        engine = data.get("engine", SIMULATION_ENGINE)
+        if engine == "monthly":
+            params["career_switch_month"] = int(data.get("career_switch_month", 1))
+            params["purchase_month"] = int(data.get("purchase_month", 1))
+        response_format = parse_response_format(data)
+        dtype = data.get("dtype", "float32")
+        mimetype = BINARY_MIMETYPE if response_format == "binary" else "application/json"
+        cache_key = simulation_cache.key(f"{engine}:{response_format}:{dtype}", params)
+        cached = simulation_cache.get(cache_key)
+        if cached is not None:
+            return encoded_response(cached, mimetype)
+
+        if engine == "numpy":
+            # Edits to the career switch or house purchase only re-solve the years they affect
+            results = incremental_simulator.simulate(**params)
+        else:
+            results = simulate_retirement(**params, engine=engine)
+        body, mimetype = encode_results(results, response_format, dtype)
+        simulation_cache.set(cache_key, body)
+        return encoded_response(body, mimetype)
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
+    except PoolTimeout as e:
+        return jsonify({"error": str(e)}), 504
     except Exception as e:
         logging.error(f"Simulation error: {e}", exc_info=True)
         return jsonify({"error": "Error in running scenario simulation"}), 500
 
 
+@app.route("/run_simulation_batch", methods=["POST"])
+@login_required
+def run_simulation_batch():
+    try:
+        data = request.get_json()
+        base = data.get("base", {})
+
+        if "grid" in data:
+            scenarios = expand_grid(base, data["grid"], max_scenarios=MAX_BATCH_SCENARIOS)
+        else:
+            scenarios = [{**base, **scenario} for scenario in data.get("scenarios", [])]
+
+        if not scenarios:
+            return jsonify({"error": "No scenarios provided"}), 400
+        if len(scenarios) > MAX_BATCH_SCENARIOS:
+            return jsonify({"error": f"A batch cannot contain more than {MAX_BATCH_SCENARIOS} scenarios"}), 400
+
+        scenarios = [parse_simulation_params(scenario) for scenario in scenarios]
+        response_format = parse_response_format(data)
+        include_trajectories = bool(data.get("include_trajectories", False))
+        if simulation_executor and len(scenarios) >= PARALLEL_MIN_SCENARIOS:
+            results = simulation_executor.batch(
+                scenarios, include_trajectories=include_trajectories, time_budget=parse_time_budget(data)
+            )
+        else:
+            results = simulate_batch(scenarios, include_trajectories=include_trajectories)
+
+        # Batch results are already columnar
+        if response_format == "binary":
+            return encoded_response(encode_binary(results, data.get("dtype", "float32")), BINARY_MIMETYPE)
+        return encoded_response(encode_json(results), "application/json")
+    except (ValueError, TypeError, KeyError) as e:
+        return jsonify({"error": str(e)}), 400
+    except PoolTimeout as e:
+        return jsonify({"error": str(e)}), 504
+    except Exception as e:
+        logging.error(f"Batch simulation error: {e}", exc_info=True)
+        return jsonify({"error": "Error in running batch scenario simulation"}), 500
+
+
+@app.route("/goal_seek", methods=["POST"])
+@login_required
+def run_goal_seek():
+    try:
+        data = request.get_json()
+        params = parse_simulation_params(data)
+        target = data.get("target", "monthly_expenses")
+        target_age = int(data.get("target_age", 90))
+
+        results = goal_seek(target, params, target_age)
+        return jsonify(results)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logging.error(f"Goal seek error: {e}", exc_info=True)
+        return jsonify({"error": "Error in running goal seek"}), 500
+
+
+@app.route("/simulation_cache_stats")
+@login_required
+def simulation_cache_stats():
+    return jsonify({**simulation_cache.stats(), "incremental": incremental_simulator.stats()})
+
+
 @app.route("/scenario_simulation")
 @login_required
 def scenario_simulation():
@@ -775,9 +1010,7 @@ def home():
 @app.route("/dashboard")
 @login_required
 def dashboard():
-    user = User.get(User.username == session["username"])
-    data_invest = DataInvestment.select().where(DataInvestment.user == user)
-    data_overview = DataOverview.select().where(DataOverview.user == user)
+    data = dashboard_data.get(session["username"])
     
     
     timestamp1 = np.random.randint(1, 1000000)
@@ -788,106 +1021,161 @@ def dashboard():
         "Mutual Fund": 0,
         "Stock": 0  
     }
-    for invest in data_invest:
-        invest_totals[invest.invest_type] += invest.amount
+    invest_totals.update(data["summary"]["invest_totals"])
         
     # Pass flag to show graph based on button click
     show_bank_chart = request.args.get('show_bank_chart', False)
     show_invest_chart = request.args.get('show_invest_chart', False)
     
-    return render_template("dashboard.html", investment=data_invest, invest_totals=invest_totals, overview=data_overview,timestamp1=timestamp1,timestamp2=timestamp2, show_bank_chart=show_bank_chart, show_invest_chart=show_invest_chart)
+    return render_template("dashboard.html", investment=data["investments"], invest_totals=invest_totals, overview=data["overview"], bank_totals=data["summary"]["bank_totals"], account_count=data["summary"]["account_count"],timestamp1=timestamp1,timestamp2=timestamp2, show_bank_chart=show_bank_chart, show_invest_chart=show_invest_chart)
+
+def chart_response(name, user, data, **params):
+    # Charts are content addressed, so the ETag is known before rendering and a revalidation never renders.
+    # Every format and size is a separate variant with its own key.
+    try:
+        params.update(parse_chart_variant(request.args, request.accept_mimetypes))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    etag = chart_key(name, data, **params)
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        body = chart_cache.get(etag)
+        if body is None:
+            if chart_pool:
+                try:
+                    body = chart_pool.call(render_chart, name, data, params,
+                                           deadline=time.monotonic() + CHART_RENDER_TIMEOUT)
+                except PoolTimeout as e:
+                    logging.warning(f"Chart rendering timed out: {e}")
+                    return jsonify({"error": "Chart rendering is busy, please try again later."}), 503
+            else:
+                body = render_chart(name, data, params)
+            chart_cache.set(etag, body, user.id)
+        response = Response(body, mimetype=CHART_FORMATS[params["format"]])
+    response.set_etag(etag)
+    response.vary.add("Accept")
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+def chart_data_response(name, series):
+    etag = chart_key(f"{name}_data", series)
+    response = Response(status=304) if request.if_none_match.contains(etag) else jsonify(series)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
 
 @app.route("/view_overview")
 @login_required
 def view_overview():
-    user = User.get(User.username == session["username"])
-    overview = DataOverview.select().where(DataOverview.user == user)
+    data = dashboard_data.get(session["username"])
+    return chart_response("overview", data["user"], overview_chart_data(data["overview"]))
 
-    fig, ax = plt.subplots(figsize=(15, 11))
-    
-    bank_accounts={}
-    for account in overview:
-        if account.bank_name not in bank_accounts:
-            bank_accounts[account.bank_name] = {}
-            
-        bank_accounts[account.bank_name][account.account_type] = account.balance
+@app.route("/view_invest")
+@login_required
+def view_invest():
+    data = dashboard_data.get(session["username"])
+    return chart_response("invest", data["user"], data["summary"]["invest_totals"], username=session["username"])
 
+@app.route("/view_overview_data")
+@login_required
+def view_overview_data():
+    data = dashboard_data.get(session["username"])
+    return chart_data_response("overview", overview_series(overview_chart_data(data["overview"])))
 
-    index = np.arange(len(bank_accounts))
-    bottom = np.zeros(len(bank_accounts))
-    
-    for i, (bank, data) in enumerate(bank_accounts.items()):
-        for j, (account, balance) in enumerate(data.items()):
-            ax.bar(index[i], balance, 0.8, bottom=bottom[i], label=f'{account}', color=np.random.rand(3,))
-            bottom[i] += float(balance)
-            ax.text(
-                index[i],
-                bottom[i] - float(balance) / 2,
-                f'${balance}',
-                ha='center',
-                va='center',
-                color='white',
-                fontweight='bold',
-                fontsize=7,
-            )
-            
-    ax.legend(title="Account Types")
-    ax.set_ylabel('Total Balance')
-    ax.set_title('Bank Account Balances Stacked by Bank')
-    ax.set_xticks(index)
-    ax.set_xticklabels(list(bank_accounts.keys()))
-    
-    img = BytesIO()
-    plt.savefig(img, format='png')
-    img.seek(0)
+@app.route("/view_invest_data")
+@login_required
+def view_invest_data():
+    data = dashboard_data.get(session["username"])
+    invest_groups = data["summary"]["invest_totals"]
+    return chart_data_response("invest", {**invest_series(invest_groups), "username": session["username"]})
 
-    plt.close(fig)
+STREAM_BUFFER_SIZE = 8 * 1024  # Characters of a streamed page sent per write
 
-    response = Response(img.getvalue(), mimetype='image/png')
-    response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-    response.headers['Pragma'] = 'no-cache'
-    response.headers['Expires'] = '0'
-    
-    return response
 
-@app.route("/view_invest")
-@login_required
-def view_invest():
-    user = User.get(User.username == session["username"])
-    
-    data = DataInvestment.select().where(DataInvestment.user == user)
-    
-    invest_groups = {}
-    for invest in data:
-        invest_type = invest.invest_type
-        amount = invest.amount
-        if invest_type not in invest_groups:
-            invest_groups[invest_type] = 0
-        invest_groups[invest_type] += amount   
-    fig = plt.figure(figsize=(8, 8))
-    plt.pie(invest_groups.values(), labels=invest_groups.keys(), autopct='%1.1f%%', startangle=140)
-    plt.title(f'{session["username"]} Investment Distribution')
-    
-    img = BytesIO()
-    plt.savefig(img, format='png')
-    img.seek(0)
+def streamed_page(template_name, **context):
+    # Render a list page while its rows are read, sending it in chunks of STREAM_BUFFER_SIZE characters
+    # instead of one write per template fragment
+    chunks = stream_template(template_name, **context)
 
-    plt.close(fig)
+    def generate():
+        buffer = []
+        size = 0
+        for chunk in chunks:
+            buffer.append(chunk)
+            size += len(chunk)
+            if size >= STREAM_BUFFER_SIZE:
+                yield "".join(buffer)
+                buffer = []
+                size = 0
+        yield "".join(buffer)
+
+    return Response(generate(), mimetype="text/html")
 
-    response = Response(img.getvalue(), mimetype='image/png')
-    response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-    response.headers['Pragma'] = 'no-cache'
-    response.headers['Expires'] = '0'
-    
-    return response
 
 @app.route("/account/<int:account_id>")
 @login_required
 def account_details(account_id):
     user = User.get(User.username == session["username"])
-    account = DataTransaction.select().where((DataTransaction.user == user) & (DataTransaction.bank_account_id == account_id))
-    account_name = DataOverview.select().where((DataOverview.user == user) & (DataOverview.account_id == account_id))
-    return render_template("account_info.html", account=account, name=account_name)
+    # Transactions reference the DataOverview row, not the account id from the uploaded file
+    account_name = DataOverview.get_or_none((DataOverview.user == user) & (DataOverview.account_id == account_id))
+    if account_name is None:
+        return jsonify({"error": "Account not found"}), 404
+
+    filters = {
+        "start": request.args.get("start", ""),
+        "end": request.args.get("end", ""),
+        "q": request.args.get("q", "").strip(),
+    }
+    try:
+        start = datetime.strptime(filters["start"], "%Y-%m-%d").date() if filters["start"] else None
+        end = datetime.strptime(filters["end"], "%Y-%m-%d").date() if filters["end"] else None
+        page_size = min(int(request.args.get("page_size", PAGE_SIZE)), MAX_PAGE_SIZE)
+        page = TransactionPage(
+            account_name,
+            after=request.args.get("after"),
+            before=request.args.get("before"),
+            start=start,
+            end=end,
+            search=filters["q"],
+            limit=max(page_size, 1),
+        )
+    except ValueError:
+        return jsonify({"error": "Invalid date filter, page size or page cursor"}), 400
+    if "page_size" in request.args:
+        # Carried into the page links so that every page has the requested size
+        filters["page_size"] = page.limit
+
+    return streamed_page("account_info.html", account=page, name=[account_name], filters=filters)
+
+@app.route("/account/<int:account_id>/balance_history")
+@login_required
+def account_balance_history(account_id):
+    try:
+        points = int(request.args.get("points", HISTORY_POINTS))
+    except ValueError:
+        return jsonify({"error": "Number of points must be a whole number"}), 400
+    if not (3 <= points <= MAX_HISTORY_POINTS):
+        return jsonify({"error": f"Number of points must be between 3 and {MAX_HISTORY_POINTS}"}), 400
+
+    user = User.get(User.username == session["username"])
+    # Background imports finish in another process, so the key includes the user's latest finished import,
+    # and nothing is cached while an import is still adding rows
+    latest_import, importing = import_state(user)
+    cache_key = f"{user.id}:{account_id}:{points}:{latest_import}"
+    body = None if importing else balance_history_cache.get(cache_key)
+    if body is None:
+        account = DataOverview.get_or_none((DataOverview.user == user) & (DataOverview.account_id == account_id))
+        if account is None:
+            return jsonify({"error": "Account not found"}), 404
+        body = encode_json(balance_history(account, points))
+        if not importing:
+            balance_history_cache.set(cache_key, body, user.id)
+
+    response = Response(body, mimetype="application/json")
+    response.add_etag()
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response.make_conditional(request)
 
 @app.route("/invest/<ticker>")
 @login_required
@@ -927,35 +1215,19 @@ def data_overview():
         if file:
             user = User.get(User.username == session["username"])
             
-            file_content = file.stream.read().decode("utf-8-sig")
-            csv_file = StringIO(file_content)
-            csvreader = csv.DictReader(csv_file, delimiter=",")
+            csvreader = read_csv(file.stream)
             
-            required_fields = ["Account ID", "Bank Name", "Bank Name (Short)", "Account Type", "Balance"]
-            if not csvreader.fieldnames or not all(field in csvreader.fieldnames for field in required_fields):
-                logging.error(f"Incorrect CSV format - Required columns: {required_fields}, Received columns: {csvreader.fieldnames}")
+            if not csvreader.fieldnames or not all(field in csvreader.fieldnames for field in OVERVIEW_COLUMNS):
+                logging.error(f"Incorrect CSV format - Required columns: {OVERVIEW_COLUMNS}, Received columns: {csvreader.fieldnames}")
                 return jsonify({"success": False, "message": "Missing required columns in CSV"}), 400
             
-            for line in csvreader:
-                balance = float(line['Balance'].replace(',', ''))
-                existing = DataOverview.select().where(
-                    (DataOverview.account_id == int(line['Account ID'])) & 
-                    (DataOverview.user == user)
-                ).first()
-
-                if existing:
-                    existing.balance = balance
-                    existing.save()
-                    logging.debug(f"Updated Account ID: {int(line['Account ID'])} with new balance: {balance}")
-                else:
-                    DataOverview.create(
-                        user=user,
-                        account_id=int(line['Account ID']),
-                        bank_name=line['Bank Name'],
-                        bank_name_short=line['Bank Name (Short)'],
-                        account_type=line['Account Type'],
-                        balance=balance
-                    )
+            with database.atomic():
+                count = upsert_overview(user, csvreader)
+                logging.debug(f"Upserted {count} accounts")
+                refresh_portfolio_summary(user)
+            chart_cache.invalidate_user(user.id)
+            dashboard_data.invalidate(user.username)
+            balance_history_cache.invalidate_user(user.id)
                 
         data_overviews = DataOverview.select().where(DataOverview.user == user)
 
@@ -983,43 +1255,61 @@ def data_transaction():
         if file:
             user = User.get(User.username == session["username"])
             
-            file_content = file.stream.read().decode("utf-8-sig")
-            csv_file = StringIO(file_content)
-            csvreader = csv.DictReader(csv_file, delimiter=",")
-            
-            logging.debug(f"CSV Headers: {csvreader.fieldnames}")
+            if import_pool:
+                job_id = uuid.uuid4()
+                os.makedirs(IMPORT_SPOOL_DIR, exist_ok=True)
+                path = os.path.join(IMPORT_SPOOL_DIR, f"{job_id}.csv")
+                file.save(path)
+                with open(path, "rb") as f:
+                    fieldnames, _ = read_columns(f, TRANSACTION_COLUMNS)
+                if not all(field in fieldnames for field in TRANSACTION_COLUMNS):
+                    os.remove(path)
+                    logging.error(f"Incorrect CSV format - Required columns: {TRANSACTION_COLUMNS}, Received columns: {fieldnames}")
+                    return jsonify({"success": False, "message": "Missing required columns in CSV"}), 400
+
+                enqueue_import(user, job_id, path)
+                dispatch_import_jobs()
+                return jsonify({
+                    "success": True,
+                    "message": 'CSV data has been uploaded and queued for import',
+                    "job_id": str(job_id),
+                    "status_url": url_for("import_job_status", job_id=job_id),
+                }), 202
+
+            fieldnames, chunks = read_columns(file.stream, TRANSACTION_COLUMNS, text_columns=TRANSACTION_TEXT_COLUMNS)
             
-            for line in csvreader:
-                try:
-                    bank_account = DataOverview.get(
-                        (DataOverview.account_id == int(line['Bank Account ID'])) & 
-                        (DataOverview.user == user)
-                    )
-                    logging.debug(bank_account)
-                    DataTransaction.create(
-                        user=user,
-                        bank_account_id=bank_account,
-                        date=datetime.strptime(line['Date'], '%Y-%m-%d').date(),
-                        description=line['Description'],
-                        amount=float(line['Amount'].replace(',', '')),
-                    )
-                except DataOverview.DoesNotExist:
-                    logging.error(f"Account ID {line['Bank Account ID']} does not exist in DataOverview. Skipping transaction.")
-                    continue 
-                
-        transactions = DataTransaction.select().where(DataTransaction.user == user)
+            if not all(field in fieldnames for field in TRANSACTION_COLUMNS):
+                logging.error(f"Incorrect CSV format - Required columns: {TRANSACTION_COLUMNS}, Received columns: {fieldnames}")
+                return jsonify({"success": False, "message": "Missing required columns in CSV"}), 400
+
+            result = import_transactions(user, chunks)
+            balance_history_cache.invalidate_user(user.id)
 
-        # Print out the records from the database
-        logging.debug("Added Records in Database:")
-        for transaction in transactions:
-            logging.debug(f"Account ID: {transaction.bank_account_id.account_id}, Date: {transaction.date}, "
-                          f"Description: {transaction.description}, Amount: {transaction.amount}")
+            if result["unknown_accounts"]:
+                logging.error(f"Account IDs {result['unknown_accounts']} do not exist in DataOverview. Skipped their transactions.")
+            logging.info(f"Imported {result['inserted']} transactions for {user.username}, skipped {result['skipped']}")
+            return jsonify({
+                "success": True,
+                "message": 'CSV data has been uploaded and processed',
+                "inserted": result["inserted"],
+                "skipped": result["skipped"],
+                "errors": result["errors"],
+            })
 
     except Exception as e:
         logging.error(f"Error in data_transaction: {e}", exc_info=True)
         return jsonify({"success": False, "message": "Error in processing Transaction data"}), 500
     return jsonify({"success": True, "message": 'CSV data has been uploaded and processed'})
 
+@app.route("/import_jobs/<uuid:job_id>")
+@login_required
+def import_job_status(job_id):
+    user = User.get(User.username == session["username"])
+    job = ImportJob.get_or_none((ImportJob.job_id == job_id) & (ImportJob.user == user))
+    if job is None:
+        return jsonify({"error": "Import job not found"}), 404
+    return jsonify(job_status(job))
+
 @app.route("/data_invest", methods=['POST'])
 @login_required
 @db_retry(max_attempts=3)
@@ -1030,52 +1320,26 @@ def data_invest():
         if file:
             user = User.get(User.username == session["username"])
             
-            file_content = file.stream.read().decode("utf-8-sig")
-            csv_file = StringIO(file_content)
-            csvreader = csv.DictReader(csv_file, delimiter=",")
+            fieldnames, chunks = read_columns(file.stream, INVEST_COLUMNS, text_columns=INVEST_TEXT_COLUMNS)
             
-            logging.debug(f"CSV Headers: {csvreader.fieldnames}")
+            logging.debug(f"CSV Headers: {fieldnames}")
+            if not all(field in fieldnames for field in INVEST_COLUMNS):
+                logging.error(f"Incorrect CSV format - Required columns: {INVEST_COLUMNS}, Received columns: {fieldnames}")
+                return jsonify({"success": False, "message": "Missing required columns in CSV"}), 400
             
-            for line in csvreader:
-                price = line['Price Bought']
-                price=float(price) if price != "N/A" else None
-                quantity=int(line['Quantity']) if line['Quantity'] != "N/A" else None
-                if price is not None or quantity is not None:
-                    amount = round(float(price*quantity), 2)
-                else:
-                    amount = round(float(line['Amount Invested'].replace(',', '')), 2)
-                existing = (
-                    DataInvestment.select()
-                    .where(
-                        (DataInvestment.name == line["Investment Name"]) &
-                        (DataInvestment.user == user)
-                    )
-                    .first()
-                )
-                if existing:
-                    existing.amount = amount
-                    existing.date = datetime.strptime(line['Investment Date'], '%Y-%m-%d').date()
-                    existing.save()
-                    logging.debug(f"Updated Investment Named: {line['Investment Name']} with new balance: {amount}")
-                else:
-                    DataInvestment.create(
-                        user=user,
-                        name=line['Investment Name'],
-                        ticker=line['Ticker Name'],
-                        invest_type=line['Investment Type'],
-                        price=price,
-                        quantity=quantity,
-                        amount=amount,
-                        date=datetime.strptime(line['Investment Date'], '%Y-%m-%d').date(),
-                    )
-
-                
-        invest = DataInvestment.select().where(DataInvestment.user == user)
-
-        # Print out the records from the database
-        logging.debug("Added Records in Database:")
-        for investment in invest:
-            logging.debug(f"Date: {investment.date}, Name: {investment.name}, Amount: {investment.amount}")
+            with database.atomic():
+                result = upsert_investments(user, chunks)
+                logging.debug(f"Upserted {result['imported']} investments, skipped {result['skipped']}")
+                refresh_portfolio_summary(user)
+            chart_cache.invalidate_user(user.id)
+            dashboard_data.invalidate(user.username)
+            return jsonify({
+                "success": True,
+                "message": 'CSV data has been uploaded and processed',
+                "imported": result["imported"],
+                "skipped": result["skipped"],
+                "errors": result["errors"],
+            })
 
     except Exception as e:
         logging.error(f"Error in data_invest: {e}", exc_info=True)
@@ -0,0 +1,105 @@
+import numpy as np
+from peewee import Case, fn
+
+from model import DataTransaction
+
+HISTORY_POINTS = 500  # Points returned for display when the caller does not ask for a number
+MAX_HISTORY_POINTS = 5000
+
+
+def daily_flows(account):
+    """Per-day inflows, outflows, transaction counts and end-of-day balances of a DataOverview account.
+
+    SQLite aggregates the transactions of each day and computes the running balance as a window over the
+    days, anchored so that the last day ends on the account's current balance. Values are read without
+    peewee's Decimal/date conversion and handed to NumPy as whole columns.
+    """
+    amount = DataTransaction.amount
+    rows = (DataTransaction
+            .select(
+                fn.date(DataTransaction.date).coerce(False),
+                fn.SUM(Case(None, [(amount > 0, amount)], 0)).coerce(False),
+                fn.SUM(Case(None, [(amount < 0, amount)], 0)).coerce(False),
+                fn.COUNT(DataTransaction.transaction_id),
+                fn.SUM(fn.SUM(amount)).over(order_by=[DataTransaction.date]).coerce(False),
+            )
+            .where(DataTransaction.bank_account_id == account.id)
+            .group_by(DataTransaction.date)
+            .order_by(DataTransaction.date)
+            .tuples())
+    columns = list(zip(*rows)) or [(), (), (), (), ()]
+    dates, inflow, outflow, counts, running = columns
+
+    running = np.array(running, dtype=float)
+    return {
+        "dates": np.array(dates, dtype="datetime64[D]"),
+        "inflow": np.array(inflow, dtype=float),
+        "outflow": np.array(outflow, dtype=float),
+        "counts": np.array(counts, dtype=int),
+        "balances": float(account.balance) - (running[-1] if len(running) else 0) + running,
+    }
+
+
+def monthly_rollup(flows):
+    # Inflows, outflows, net flow, closing balance and transaction count per calendar month
+    months = flows["dates"].astype("datetime64[M]")
+    if not len(months):
+        return {"months": [], "inflow": [], "outflow": [], "net": [], "balance": [], "transactions": []}
+
+    starts = np.flatnonzero(np.r_[True, months[1:] != months[:-1]])
+    ends = np.r_[starts[1:], len(months)] - 1
+    inflow = np.add.reduceat(flows["inflow"], starts)
+    outflow = np.add.reduceat(flows["outflow"], starts)
+    return {
+        "months": np.datetime_as_string(months[starts]).tolist(),
+        "inflow": np.round(inflow, 2).tolist(),
+        "outflow": np.round(outflow, 2).tolist(),
+        "net": np.round(inflow + outflow, 2).tolist(),
+        "balance": np.round(flows["balances"][ends], 2).tolist(),
+        "transactions": np.add.reduceat(flows["counts"], starts).tolist(),
+    }
+
+
+def lttb(x, y, threshold):
+    """Largest-Triangle-Three-Buckets downsampling; returns the indices of the points to keep.
+
+    The first and last points are always kept, and each bucket in between keeps the point that forms the
+    largest triangle with the previously kept point and the average of the next bucket.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    edges = np.append(np.linspace(1, n - 1, threshold - 1).astype(int), n)
+    selected = np.empty(threshold, dtype=int)
+    selected[0] = 0
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_x = x[edges[i + 1]:edges[i + 2]].mean()
+        next_y = y[edges[i + 1]:edges[i + 2]].mean()
+        area = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(area.argmax())
+        selected[i + 1] = previous
+    selected[-1] = n - 1
+    return selected
+
+
+def balance_history(account, points=HISTORY_POINTS):
+    flows = daily_flows(account)
+    dates, balances = flows["dates"], flows["balances"]
+    keep = lttb(dates.astype(float), balances, points)
+    return {
+        "account_id": account.account_id,
+        "bank_name": account.bank_name,
+        "account_type": account.account_type,
+        "balance": float(account.balance),
+        "days": len(dates),
+        "downsampled": len(keep) < len(dates),
+        "dates": np.datetime_as_string(dates[keep]).tolist(),
+        "balances": np.round(balances[keep], 2).tolist(),
+        "monthly": monthly_rollup(flows),
+    }
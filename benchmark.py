@@ -0,0 +1,176 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+from simulation import (
+    SIMULATION_PARAMETERS,
+    generate_summary,
+    simulate_batch,
+    simulate_monte_carlo,
+    simulate_retirement,
+)
+
+BASELINE_FILE = os.getenv("BENCHMARK_BASELINE", "benchmark_baseline.json")
+REGRESSION_THRESHOLD = float(os.getenv("BENCHMARK_THRESHOLD", 0.25))  # Allowed slowdown versus the baseline
+MIN_RUN_TIME = 0.2  # Seconds each repeat of a benchmark runs for
+REPEATS = 5
+
+HORIZONS = (10, 35, 70)
+BATCH_SIZES = (100, 1000, 10000)
+MONTE_CARLO_PATHS = (1000, 10000)
+
+
+def scenario(working_years, **overrides):
+    params = {
+        "current_age": 25,
+        "retirement_age": 25 + working_years,
+        "monthly_income": 6000,
+        "monthly_expenses": 3500,
+        "monthly_savings": 1000,
+        "investment_strategy": "balanced",
+        "investment_increase": 10,
+        "career_switch_impact": 12000,
+        "purchase_amount": 250000,
+        "career_switch_age": 25 + working_years // 3,
+        "purchase_age": 25 + working_years // 2,
+        "retirement_investment_strategy": "conservative",
+    }
+    params.update(overrides)
+    return {name: params[name] for name in SIMULATION_PARAMETERS}
+
+
+def batch_scenarios(count):
+    strategies = ("conservative", "balanced", "aggressive")
+    return [
+        scenario(10 + i % 40, monthly_expenses=2000 + i % 3000, investment_strategy=strategies[i % 3])
+        for i in range(count)
+    ]
+
+
+def benchmarks(quick=False):
+    # Name -> zero-argument callable; inputs are built up front so only the call itself is timed
+    horizons = HORIZONS[:2] if quick else HORIZONS
+    cases = {}
+    for years in horizons:
+        params = scenario(years)
+        for engine in ("python", "numpy", "monthly"):
+            cases[f"single/{engine}/{years}y"] = lambda params=params, engine=engine: simulate_retirement(
+                **params, engine=engine
+            )
+        results = simulate_retirement(**params)
+        cases[f"summary/{years}y"] = lambda results=results, params=params: generate_summary(
+            results["working_phase"], results["retirement_phase"], params["retirement_age"]
+        )
+
+    for count in BATCH_SIZES[:2] if quick else BATCH_SIZES:
+        scenarios = batch_scenarios(count)
+        cases[f"batch/{count}"] = lambda scenarios=scenarios: simulate_batch(scenarios)
+
+    for n_paths in MONTE_CARLO_PATHS[:1] if quick else MONTE_CARLO_PATHS:
+        params = scenario(35)
+        cases[f"monte_carlo/{n_paths}"] = lambda params=params, n_paths=n_paths: simulate_monte_carlo(
+            **params, n_paths=n_paths, seed=0
+        )
+    return cases
+
+
+def measure(fn):
+    # Calibrate the number of calls per repeat, then keep the median time per call over the repeats
+    calls = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_RUN_TIME / 10 or calls >= 1000000:
+            break
+        calls *= 10
+    calls = max(1, int(calls * MIN_RUN_TIME / max(elapsed, 1e-9)))
+
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        timings.append((time.perf_counter() - start) / calls)
+
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    seconds = statistics.median(timings)
+    return {
+        "seconds": seconds,
+        "ops_per_sec": 1 / seconds,
+        "stdev_pct": statistics.stdev(timings) / seconds * 100 if len(timings) > 1 else 0.0,
+        "peak_memory_kb": peak / 1024,
+    }
+
+
+def compare(results, baseline, threshold):
+    # Names of benchmarks that are slower than the baseline by more than the threshold
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            continue
+        change = result["seconds"] / previous["seconds"] - 1
+        result["change_pct"] = change * 100
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the retirement simulation")
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this text")
+    parser.add_argument("--quick", action="store_true", help="Skip the largest horizons and batch sizes")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="Baseline file to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="Fail when a benchmark is slower than the baseline by more than this fraction")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'benchmark':<28}{'ops/sec':>12}{'time':>12}{'stdev':>8}{'peak mem':>12}{'change':>9}")
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    for name, fn in benchmarks(args.quick).items():
+        if args.filter not in name:
+            continue
+        result = results[name] = measure(fn)
+        compare({name: result}, baseline, args.threshold)
+        change = f"{result['change_pct']:+.1f}%" if "change_pct" in result else "-"
+        print(f"{name:<28}{result['ops_per_sec']:>12.1f}{result['seconds'] * 1e6:>10.1f}us"
+              f"{result['stdev_pct']:>7.1f}%{result['peak_memory_kb']:>10.1f}KB{change:>9}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(), "results": results},
+                      f, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    if not baseline:
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"Regressed by more than {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    print(f"No regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,248 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+import matplotlib
+import numpy as np
+from matplotlib.figure import Figure
+
+# Bump whenever the rendering code changes so that clients holding an old ETag get the new chart
+CHART_VERSION = 2
+
+CHART_FORMATS = {
+    "png": "image/png",
+    "webp": "image/webp",
+    "svg": "image/svg+xml",
+}
+CHART_DPI = 100
+MIN_CHART_SIZE = 200  # Pixels
+MAX_CHART_SIZE = 3000
+
+# Fixed salt so that the element ids in SVG output, and therefore the cached bytes, are reproducible
+matplotlib.rcParams["svg.hashsalt"] = f"fintwin-charts-{CHART_VERSION}"
+
+# Account types are coloured by their position in the sorted list of the user's account types
+ACCOUNT_TYPE_COLOURS = matplotlib.colormaps["tab20"].colors
+
+
+def overview_chart_data(overview):
+    bank_accounts = {}
+    for account in overview:
+        if account.bank_name not in bank_accounts:
+            bank_accounts[account.bank_name] = {}
+
+        bank_accounts[account.bank_name][account.account_type] = account.balance
+    return bank_accounts
+
+
+def overview_series(bank_accounts):
+    # Stacked bar series for a client-side renderer: one dataset per account type, one value per bank
+    banks = list(bank_accounts)
+    account_types = sorted({account for data in bank_accounts.values() for account in data})
+    return {
+        "banks": banks,
+        "series": [
+            {
+                "account_type": account,
+                "balances": [float(bank_accounts[bank].get(account, 0)) for bank in banks],
+            }
+            for account in account_types
+        ],
+    }
+
+
+def invest_series(invest_groups):
+    return {
+        "invest_types": list(invest_groups),
+        "amounts": [float(amount) for amount in invest_groups.values()],
+    }
+
+
+def chart_key(name, data, **params):
+    # Content address of a chart: the same data and parameters always render the same image
+    payload = json.dumps([CHART_VERSION, name, data, params], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def parse_chart_variant(args, accept_mimetypes):
+    # Format from ?format= or the Accept header, and an optional target size in pixels from ?width=/?height=
+    chart_format = args.get("format")
+    if chart_format is None:
+        mimetype = accept_mimetypes.best_match(list(CHART_FORMATS.values()), default="image/png")
+        chart_format = next(name for name, value in CHART_FORMATS.items() if value == mimetype)
+    if chart_format not in CHART_FORMATS:
+        raise ValueError(f"Chart format must be one of {', '.join(CHART_FORMATS)}")
+
+    variant = {"format": chart_format, "width": None, "height": None}
+    for dimension in ("width", "height"):
+        if args.get(dimension) is None:
+            continue
+        try:
+            value = int(args[dimension])
+        except ValueError:
+            raise ValueError(f"Chart {dimension} must be a whole number of pixels")
+        if not (MIN_CHART_SIZE <= value <= MAX_CHART_SIZE):
+            raise ValueError(f"Chart {dimension} must be between {MIN_CHART_SIZE} and {MAX_CHART_SIZE} pixels")
+        variant[dimension] = value
+    return variant
+
+
+def chart_figure(default_size, width=None, height=None):
+    # The canvas is resized rather than rescaled, so text stays legible on small displays; a single
+    # dimension keeps the default aspect ratio
+    default_width, default_height = default_size
+    if width and height:
+        size = (width / CHART_DPI, height / CHART_DPI)
+    elif width:
+        size = (width / CHART_DPI, width / CHART_DPI * default_height / default_width)
+    elif height:
+        size = (height / CHART_DPI * default_width / default_height, height / CHART_DPI)
+    else:
+        size = default_size
+    return Figure(figsize=size, dpi=CHART_DPI)
+
+
+def save_figure(fig, chart_format):
+    img = BytesIO()
+    if chart_format == "svg":
+        fig.savefig(img, format="svg", metadata={"Date": None})
+    elif chart_format == "webp":
+        fig.savefig(img, format="webp", pil_kwargs={"quality": 90})
+    else:
+        fig.savefig(img, format="png")
+    return img.getvalue()
+
+
+# Charts are drawn on standalone Figure objects rather than through pyplot, whose current-figure state is
+# global to the process and not safe to share between concurrent requests
+
+def render_chart(name, data, params):
+    # Entry point for the renderer processes
+    return CHART_RENDERERS[name](data, **params)
+
+
+def render_overview_chart(bank_accounts, format="png", width=None, height=None):
+    fig = chart_figure((15, 11), width, height)
+    ax = fig.subplots()
+
+    account_types = sorted({account for data in bank_accounts.values() for account in data})
+    colours = {account: ACCOUNT_TYPE_COLOURS[i % len(ACCOUNT_TYPE_COLOURS)] for i, account in enumerate(account_types)}
+    labelled = set()
+
+    index = np.arange(len(bank_accounts))
+    bottom = np.zeros(len(bank_accounts))
+
+    for i, (bank, data) in enumerate(bank_accounts.items()):
+        for account, balance in data.items():
+            label = account if account not in labelled else '_nolegend_'
+            labelled.add(account)
+            ax.bar(index[i], balance, 0.8, bottom=bottom[i], label=label, color=colours[account])
+            bottom[i] += float(balance)
+            ax.text(
+                index[i],
+                bottom[i] - float(balance) / 2,
+                f'${balance}',
+                ha='center',
+                va='center',
+                color='white',
+                fontweight='bold',
+                fontsize=7,
+            )
+
+    ax.legend(title="Account Types")
+    ax.set_ylabel('Total Balance')
+    ax.set_title('Bank Account Balances Stacked by Bank')
+    ax.set_xticks(index)
+    ax.set_xticklabels(list(bank_accounts.keys()))
+
+    return save_figure(fig, format)
+
+
+def render_invest_chart(invest_groups, username, format="png", width=None, height=None):
+    fig = chart_figure((8, 8), width, height)
+    ax = fig.subplots()
+    # Recent Matplotlib releases reject Decimal wedge sizes
+    amounts = [float(amount) for amount in invest_groups.values()]
+    ax.pie(amounts, labels=invest_groups.keys(), autopct='%1.1f%%', startangle=140)
+    ax.set_title(f'{username} Investment Distribution')
+
+    return save_figure(fig, format)
+
+
+CHART_RENDERERS = {
+    "overview": render_overview_chart,
+    "invest": render_invest_chart,
+}
+
+
+def warm_up_charts():
+    # Load the font cache, the Agg/SVG backends and Pillow by drawing each chart once, small, in every format,
+    # so that the first real chart of a process does not pay for them
+    for chart_format in CHART_FORMATS:
+        render_overview_chart({"Bank": {"Savings": 1}}, chart_format, MIN_CHART_SIZE)
+        render_invest_chart({"Stock": 1}, "", chart_format, MIN_CHART_SIZE)
+
+
+class ChartCache:
+    """In-process LRU of rendered charts keyed by chart_key, bounded by the total size of the images.
+
+    Entries are tagged with the owning user so that a data upload can drop that user's charts at once.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._users = {}
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, body, user_id):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (body, user_id)
+            self._users.setdefault(user_id, set()).add(key)
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                self._discard(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            for key in list(self._users.get(user_id, ())):
+                self._discard(key)
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        body, user_id = entry
+        self._size -= len(body)
+        keys = self._users.get(user_id)
+        keys.discard(key)
+        if not keys:
+            del self._users[user_id]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
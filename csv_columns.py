@@ -0,0 +1,193 @@
+import csv
+import io
+from datetime import datetime
+from itertools import islice
+
+import numpy as np
+
+CHUNK_ROWS = 10000  # CSV rows parsed together into one set of column arrays
+MAX_ROW_ERRORS = 100  # Row errors reported per upload; the rest are only counted as skipped
+MAX_CELL_LENGTH = 32  # Characters allowed in a number or date cell
+
+
+def read_columns(stream, columns, chunk_rows=CHUNK_ROWS, skip=0, text_columns=()):
+    """Read an uploaded CSV in chunks of rows, transposed into one NumPy array per requested column.
+
+    Returns the header and a generator of (first_row, {column: values}, {column: too_long}) where first_row
+    is the 1-based number of the chunk's first data row. Blank lines are ignored, and the first skip data rows
+    are passed over. Callers check the header for the columns they need before reading the chunks.
+
+    Columns to be parsed become fixed-width str arrays, where every cell takes the width of the longest one.
+    Their cells are cut to MAX_CELL_LENGTH characters, and too_long marks the cells that were cut. Columns in
+    text_columns are only passed through, so they are kept as object arrays of Python strings of any length.
+    """
+    reader = csv.reader(io.TextIOWrapper(stream, encoding="utf-8-sig", newline=""))
+    header = next(reader, [])
+
+    def chunks():
+        indices = [header.index(column) for column in columns]
+        width = len(header)
+        rows = islice((row for row in reader if row), skip, None)
+        first_row = skip + 1
+        while True:
+            chunk = list(islice(rows, chunk_rows))
+            if not chunk:
+                return
+            # Short rows are padded so that every row has a value in every column
+            chunk = [row if len(row) >= width else row + [""] * (width - len(row)) for row in chunk]
+            values = {}
+            too_long = {}
+            for column, i in zip(columns, indices):
+                cells = [row[i] for row in chunk]
+                if column in text_columns:
+                    values[column] = np.array(cells, dtype=object)
+                    continue
+                too_long[column] = np.fromiter(map(len, cells), dtype=np.int64, count=len(cells)) > MAX_CELL_LENGTH
+                if too_long[column].any():
+                    cells = [cell[:MAX_CELL_LENGTH] for cell in cells]
+                values[column] = np.array(cells, dtype=str)
+            yield first_row, values, too_long
+            first_row += len(chunk)
+
+    return header, chunks()
+
+
+def char_codes(values):
+    # One column of UCS-4 code points per character position of a NumPy str array, zero-padded on the right
+    width = max(values.dtype.itemsize // 4, 1)
+    return np.ascontiguousarray(values.view(np.uint32).reshape(len(values), width).T).astype(np.int64)
+
+
+def read_number(codes, separators=()):
+    """Read signed decimal numbers one character position at a time across the whole column.
+
+    Returns the value of all the digits as one integer, the number of digits after the decimal point, the
+    number of digits, and whether each value is made only of digits, an optional leading sign, at most one
+    point and the given separator characters.
+    """
+    n = codes.shape[1]
+    negative = codes[0] == 45
+    signed = negative | (codes[0] == 43)
+    value = np.zeros(n, dtype=np.int64)
+    digits = np.zeros(n, dtype=np.int64)
+    decimals = np.zeros(n, dtype=np.int64)
+    seen_point = np.zeros(n, dtype=bool)
+    valid = np.ones(n, dtype=bool)
+    for i, c in enumerate(codes):
+        is_digit = (c >= 48) & (c <= 57)
+        is_point = c == 46
+        ignored = c == 0
+        for separator in separators:
+            ignored |= c == separator
+        if i == 0:
+            ignored |= signed
+        valid &= is_digit | is_point | ignored
+        valid &= ~(is_point & seen_point)
+        value = np.where(is_digit, value * 10 + (c - 48), value)
+        digits += is_digit
+        decimals += is_digit & seen_point
+        seen_point |= is_point
+    value = np.where(negative, -value, value)
+    return value, decimals, digits, valid & (digits >= 1)
+
+
+def reparse(values, parsed, invalid, parse_one):
+    # Values the vectorized parser rejects get a second chance with Python's own parser, which also accepts
+    # forms such as surrounding spaces or exponents; parse_one returns None for values it rejects too
+    for i in np.flatnonzero(invalid):
+        value = parse_one(str(values[i]))
+        if value is not None:
+            parsed[i] = value
+            invalid[i] = False
+
+
+def parse_dates(values):
+    """YYYY-MM-DD strings to datetime64[D]; returns the dates and a mask of the invalid ones.
+
+    Zero-padded dates are read straight from the characters of the whole column. Anything else, such as
+    2025-3-4, is parsed with datetime.strptime().
+    """
+    codes = char_codes(values)
+    if len(codes) < 10:
+        codes = np.pad(codes, ((0, 10 - len(codes)), (0, 0)))
+    digits = codes[[0, 1, 2, 3, 5, 6, 8, 9]] - 48
+    valid = (
+        ((digits >= 0) & (digits <= 9)).all(axis=0)
+        & (codes[4] == 45) & (codes[7] == 45)
+        & (codes[10:] == 0).all(axis=0)
+    )
+    year = digits[0] * 1000 + digits[1] * 100 + digits[2] * 10 + digits[3]
+    month = digits[4] * 10 + digits[5]
+    day = digits[6] * 10 + digits[7]
+    valid &= (year >= 1) & (month >= 1) & (month <= 12) & (day >= 1)
+
+    months = np.where(valid, (year - 1970) * 12 + month - 1, 0).astype("datetime64[M]")
+    dates = months.astype("datetime64[D]") + np.where(valid, day - 1, 0)
+    valid &= dates.astype("datetime64[M]") == months  # Rejects days past the end of the month
+    dates[~valid] = np.datetime64("NaT")
+
+    def parse_one(value):
+        try:
+            return np.datetime64(datetime.strptime(value, "%Y-%m-%d").date(), "D")
+        except ValueError:
+            return None
+
+    invalid = ~valid
+    reparse(values, dates, invalid, parse_one)
+    return dates, invalid
+
+
+def parse_cents(values):
+    """Money strings such as "-1,234.56" to integer cents; returns the cents and a mask of the invalid ones.
+
+    Digits, an optional sign, thousands separators and up to two decimal places are read straight from the
+    characters of the whole column. Anything else is parsed with float() and rounded to the nearest cent.
+    """
+    value, decimals, digits, valid = read_number(char_codes(values), separators=(44,))
+    valid &= (decimals <= 2) & (digits - decimals <= 15)
+    cents = np.where(valid, value * 10 ** (2 - np.clip(decimals, 0, 2)), 0)
+
+    def parse_one(value):
+        try:
+            amount = float(value.replace(",", ""))
+        except ValueError:
+            return None
+        return round(amount * 100) if np.isfinite(amount) and abs(amount) < 1e13 else None
+
+    invalid = ~valid
+    reparse(values, cents, invalid, parse_one)
+    return cents, invalid
+
+
+def parse_integers(values):
+    # Whole numbers with an optional sign; returns the integers and a mask of the invalid ones
+    value, decimals, digits, valid = read_number(char_codes(values))
+    valid &= (decimals == 0) & (digits <= 18) & ~np.char.endswith(values, ".")
+    integers = np.where(valid, value, 0)
+
+    def parse_one(value):
+        try:
+            value = int(value)
+        except ValueError:
+            return None
+        return value if -2 ** 63 <= value < 2 ** 63 else None
+
+    invalid = ~valid
+    reparse(values, integers, invalid, parse_one)
+    return integers, invalid
+
+
+def row_errors(errors, first_row, invalid, column, values, message, limit=MAX_ROW_ERRORS):
+    # Append a report for each invalid row of a chunk to errors, keeping at most limit reports in total
+    for i in np.flatnonzero(invalid)[:max(limit - len(errors), 0)]:
+        errors.append({"row": int(first_row + i), "column": column, "value": str(values[i]), "error": message})
+
+
+def length_errors(errors, first_row, columns, too_long, limit=MAX_ROW_ERRORS):
+    # Report the cells read_columns cut short, and return the mask of the rows that had any
+    rejected = np.zeros(len(next(iter(columns.values()))), dtype=bool)
+    for column, cut in too_long.items():
+        row_errors(errors, first_row, cut, column, columns[column],
+                   f"Must be at most {MAX_CELL_LENGTH} characters", limit)
+        rejected |= cut
+    return rejected
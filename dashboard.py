@@ -0,0 +1,63 @@
+import threading
+import time
+from collections import OrderedDict
+
+from peewee import prefetch
+
+from model import DataInvestment, DataOverview, PortfolioSummary, User, summarize_portfolio
+
+
+def load_dashboard_data(username):
+    # The user and all of their investments, accounts and portfolio totals in one batch of queries
+    users = prefetch(
+        User.select().where(User.username == username),
+        DataInvestment.select().order_by(DataInvestment.id),
+        DataOverview.select().order_by(DataOverview.id),
+        PortfolioSummary.select().order_by(PortfolioSummary.id),
+    )
+    if not users:
+        raise User.DoesNotExist(f"User {username} does not exist")
+    user = users[0]
+    return {
+        "user": user,
+        "investments": list(user.invest),
+        "overview": list(user.overview),
+        "summary": summarize_portfolio(user.portfolio_summary),
+    }
+
+
+class DashboardData:
+    """Per-user cache of load_dashboard_data kept for a few seconds.
+
+    A dashboard view and the chart requests it triggers all read the same data, so they share one load.
+    Uploads invalidate the user's entry so that their next page view sees the new data.
+    """
+
+    def __init__(self, ttl=5, max_entries=1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, username):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(username)
+            if entry is not None and entry[1] > now:
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        data = load_dashboard_data(username)
+        with self._lock:
+            self._entries[username] = (data, now + self.ttl)
+            self._entries.move_to_end(username)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return data
+
+    def invalidate(self, username):
+        with self._lock:
+            self._entries.pop(username, None)
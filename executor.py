@@ -0,0 +1,186 @@
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import FIRST_EXCEPTION, ProcessPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from simulation import (
+    MONTE_CARLO_PERCENTILES,
+    monte_carlo_blocks,
+    prepare_monte_carlo,
+    run_monte_carlo_blocks,
+    simulate_batch,
+    summarize_monte_carlo,
+    validate_scenarios,
+)
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+def worker_ready():
+    return True
+
+
+class ProcessPool:
+    """Bounded pool of worker processes shared by every request of the app process.
+
+    The pool is started on first use, so it is created after Gunicorn forks its workers, and the spawn
+    start method keeps the workers free of the parent's gevent hub and database connections. At most
+    max_pending tasks are queued at once; callers wait for a free slot until their deadline.
+    """
+
+    def __init__(self, max_workers=None, max_pending=None, initializer=None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.max_workers * 4
+        self.initializer = initializer
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=self.initializer,
+                )
+            return self._executor
+
+    def _reset_executor(self, executor):
+        # A worker that dies leaves its ProcessPoolExecutor broken for good; drop it so that the next task
+        # starts a fresh one
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def start(self):
+        # Spawn every worker now, running the initializer, instead of on the first requests
+        with self._lock:
+            if self._executor is not None:
+                return
+        executor = self._get_executor()
+        for _ in range(self.max_workers):
+            executor.submit(worker_ready)
+
+    def submit(self, fn, *args, deadline=None):
+        timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+        if not self._slots.acquire(timeout=timeout):
+            raise PoolTimeout("Timed out waiting for a free worker")
+        try:
+            executor = self._get_executor()
+            try:
+                future = executor.submit(fn, *args)
+            except BrokenProcessPool:
+                logging.warning("A pool worker died, restarting the pool")
+                self._reset_executor(executor)
+                future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def call(self, fn, *args, deadline=None):
+        # Run a single task and wait for its result until the deadline
+        future = self.submit(fn, *args, deadline=deadline)
+        timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeout:
+            future.cancel()
+            raise PoolTimeout("Timed out waiting for the worker to finish")
+
+    def run(self, fn, tasks, deadline=None):
+        # Run fn(*task) for every task; returns the results of the tasks that finished before the deadline
+        # (None for the rest) in task order
+        futures = []
+        try:
+            for task in tasks:
+                futures.append(self.submit(fn, *task, deadline=deadline))
+        except PoolTimeout:
+            pass
+
+        timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+        done, not_done = wait(futures, timeout=timeout, return_when=FIRST_EXCEPTION)
+        for future in not_done:
+            future.cancel()
+        for future in done:
+            if future.exception() is not None:
+                raise future.exception()
+        return [future.result() if future in done else None for future in futures] + [None] * (len(tasks) - len(futures))
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+class SimulationExecutor:
+    """Shards large Monte Carlo and batch simulations across a ProcessPool.
+
+    Workers return NumPy arrays or columnar lists, never per-year dicts, and the shards are merged in
+    the parent process. Monte Carlo paths are drawn in seeded blocks, so the result for a given seed is
+    the same whether it runs in process or on any number of workers.
+    """
+
+    def __init__(self, max_workers=None, max_pending=None):
+        self.pool = ProcessPool(max_workers, max_pending)
+
+    def monte_carlo(self, scenario, n_paths, seed=None, percentiles=MONTE_CARLO_PERCENTILES, time_budget=None):
+        seed = prepare_monte_carlo(scenario, n_paths, seed)
+        deadline = None if time_budget is None else time.monotonic() + time_budget
+
+        blocks = monte_carlo_blocks(n_paths)
+        shards = [(scenario, seed, shard) for shard in self._shards(blocks)]
+        results = self.pool.run(run_monte_carlo_blocks, shards, deadline=deadline)
+
+        completed = [result for result in results if result is not None]
+        if not completed:
+            raise PoolTimeout("Monte Carlo simulation did not finish within the time budget")
+        working_savings = np.concatenate([result[0] for result in completed])
+        retirement_savings = np.concatenate([result[1] for result in completed])
+
+        summary = summarize_monte_carlo(scenario, working_savings, retirement_savings, seed, percentiles)
+        summary["partial"] = len(completed) < len(shards)
+        if summary["partial"]:
+            logging.warning(f"Monte Carlo time budget exceeded, returning {summary['n_paths']} of {n_paths} paths")
+        return summary
+
+    def batch(self, scenarios, include_trajectories=False, time_budget=None):
+        validate_scenarios(scenarios)
+        deadline = None if time_budget is None else time.monotonic() + time_budget
+
+        shards = [(shard, include_trajectories) for shard in self._shards(scenarios)]
+        results = self.pool.run(simulate_batch, shards, deadline=deadline)
+        if any(result is None for result in results):
+            raise PoolTimeout("Batch simulation did not finish within the time budget")
+
+        merged = {"count": sum(result["count"] for result in results)}
+        merged["parameters"] = {
+            name: [value for result in results for value in result["parameters"][name]]
+            for name in results[0]["parameters"]
+        }
+        for key in results[0]:
+            if key not in merged:
+                merged[key] = [value for result in results for value in result[key]]
+        return merged
+
+    def _shards(self, items):
+        # Contiguous, evenly sized shards; several per worker so that a Monte Carlo run that hits its
+        # time budget can still be summarised from the shards that finished
+        n_shards = min(self.pool.max_pending, len(items))
+        bounds = np.linspace(0, len(items), n_shards + 1).astype(int)
+        return [items[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+
+    def shutdown(self):
+        self.pool.shutdown()
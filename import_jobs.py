@@ -0,0 +1,111 @@
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+
+from peewee import fn
+
+from csv_columns import read_columns
+from model import ImportJob, database
+from uploads import TRANSACTION_COLUMNS, TRANSACTION_TEXT_COLUMNS, import_transactions
+
+JOB_BATCH_SIZE = 10000  # CSV rows committed together with the job's progress
+MAX_JOB_ERRORS = 100
+STALE_JOB_AFTER = 300  # Seconds without progress after which a running job is taken over by another worker
+
+
+def enqueue_import(user, job_id, path):
+    return ImportJob.create(job_id=job_id, user=user, path=path, created_at=datetime.now())
+
+
+def claim_job():
+    # Oldest queued job, or one whose worker stopped reporting progress; the IMMEDIATE transaction takes the
+    # write lock before reading, so two workers never claim the same job
+    stale = datetime.now() - timedelta(seconds=STALE_JOB_AFTER)
+    with database.atomic("IMMEDIATE"):
+        job = (ImportJob
+               .select()
+               .where((ImportJob.status == "queued") |
+                      ((ImportJob.status == "running") & (ImportJob.updated_at < stale)))
+               .order_by(ImportJob.created_at)
+               .first())
+        if job is None:
+            return None
+        job.status = "running"
+        job.started_at = job.started_at or datetime.now()
+        job.updated_at = datetime.now()
+        job.save()
+    return job
+
+
+def run_job(job):
+    """Import a spooled transaction upload in batches of JOB_BATCH_SIZE rows.
+
+    Each batch is committed together with the job's counters and row errors, so a job interrupted by a
+    restart resumes after the last committed row instead of importing the earlier ones twice.
+    """
+    user = job.user
+    errors = json.loads(job.errors)
+    try:
+        with open(job.path, "rb") as f:
+            _, chunks = read_columns(f, TRANSACTION_COLUMNS, JOB_BATCH_SIZE, skip=job.rows_processed,
+                                     text_columns=TRANSACTION_TEXT_COLUMNS)
+            for chunk in chunks:
+                with database.atomic():
+                    result = import_transactions(user, [chunk])
+                    errors += result["errors"][:max(MAX_JOB_ERRORS - len(errors), 0)]
+                    job.rows_processed += result["inserted"] + result["skipped"]
+                    job.inserted += result["inserted"]
+                    job.skipped += result["skipped"]
+                    job.errors = json.dumps(errors)
+                    job.updated_at = datetime.now()
+                    job.save()
+        job.status = "done"
+    except Exception as e:
+        logging.error(f"Import job {job.job_id} failed: {e}", exc_info=True)
+        errors.append({"row": job.rows_processed + 1, "error": f"Import stopped: {e}"})
+        job.status = "failed"
+
+    job.errors = json.dumps(errors)
+    job.finished_at = job.updated_at = datetime.now()
+    job.save()
+    if os.path.exists(job.path):
+        os.remove(job.path)
+    logging.info(f"Import job {job.job_id} {job.status}: {job.inserted} inserted, {job.skipped} skipped")
+
+
+def process_import_jobs():
+    # Entry point for the import worker processes: run jobs until the queue is empty
+    processed = 0
+    with database.connection_context():
+        while True:
+            job = claim_job()
+            if job is None:
+                return processed
+            run_job(job)
+            processed += 1
+
+
+def import_state(user):
+    # Finish time of the user's latest import job, and whether any of their jobs is still queued or running
+    latest, pending = (ImportJob
+                       .select(fn.MAX(ImportJob.finished_at), fn.COUNT(ImportJob.job_id) - fn.COUNT(ImportJob.finished_at))
+                       .where(ImportJob.user == user)
+                       .scalar(as_tuple=True))
+    return latest, pending > 0
+
+
+def job_status(job):
+    elapsed = ((job.finished_at or job.updated_at) - job.started_at).total_seconds() if job.started_at else 0
+    return {
+        "job_id": str(job.job_id),
+        "status": job.status,
+        "rows_processed": job.rows_processed,
+        "inserted": job.inserted,
+        "skipped": job.skipped,
+        "errors": json.loads(job.errors),
+        "rows_per_second": round(job.rows_processed / elapsed, 1) if elapsed > 0 else None,
+        "created_at": job.created_at.isoformat(),
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
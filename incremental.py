@@ -0,0 +1,112 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from simulation import (
+    format_results,
+    scenario_arrays,
+    validate_inputs,
+    working_phase_inputs,
+    working_phase_trajectory,
+)
+
+# Inputs that change every year of the working phase; any edit to these needs a full re-simulation
+STRUCTURAL_PARAMETERS = (
+    "current_age", "retirement_age", "monthly_income", "monthly_expenses", "investment_strategy",
+    "investment_increase"
+)
+
+# One-off events, each of which only changes the trajectory from the year it happens onwards
+EVENT_PARAMETERS = (
+    ("career_switch_age", "career_switch_impact"),
+    ("purchase_age", "purchase_amount"),
+)
+
+
+def first_changed_year(previous, params):
+    # Index of the first working year whose inputs differ between two scenarios with the same structure
+    current_age = params["current_age"]
+    horizon = params["retirement_age"] - current_age
+
+    ages = []
+    for age_name, amount_name in EVENT_PARAMETERS:
+        if (previous[age_name], previous[amount_name]) != (params[age_name], params[amount_name]):
+            ages.extend(age for age in (previous[age_name], params[age_name]) if age >= current_age)
+    return min([age - current_age for age in ages] + [horizon])
+
+
+class IncrementalSimulator:
+    """NumPy engine that checkpoints the working-phase trajectory of recently simulated scenarios.
+
+    Scenarios are keyed by their structural inputs. When only the career switch or house purchase of a
+    known scenario is edited, the stored trajectory is kept up to the first year the edit affects and
+    only the remaining years are re-solved. The retirement phase is always re-run as it depends on the
+    savings at retirement.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._checkpoints = OrderedDict()
+        self._lock = threading.Lock()
+        self.full_runs = 0
+        self.incremental_runs = 0
+
+    def simulate(self, current_age, retirement_age, monthly_income, monthly_expenses,
+                 monthly_savings, investment_strategy, investment_increase=0,
+                 career_switch_impact=0, purchase_amount=0, career_switch_age=0, purchase_age=0,
+                 retirement_investment_strategy="null"):
+        params = {
+            "current_age": current_age,
+            "retirement_age": retirement_age,
+            "monthly_income": monthly_income,
+            "monthly_expenses": monthly_expenses,
+            "investment_strategy": investment_strategy,
+            "investment_increase": investment_increase,
+            "career_switch_impact": career_switch_impact,
+            "purchase_amount": purchase_amount,
+            "career_switch_age": career_switch_age,
+            "purchase_age": purchase_age,
+        }
+        validate_inputs(monthly_savings=monthly_savings,
+                        retirement_investment_strategy=retirement_investment_strategy, **params)
+
+        key = tuple(params[name] for name in STRUCTURAL_PARAMETERS)
+        with self._lock:
+            checkpoint = self._checkpoints.get(key)
+            if checkpoint is not None:
+                self._checkpoints.move_to_end(key)
+
+        horizon = retirement_age - current_age
+        ages, annual_income, annual_savings, returns, purchases = working_phase_inputs(
+            scenario_arrays(**params), horizon
+        )
+
+        if checkpoint is None:
+            savings, investment_return = working_phase_trajectory(annual_savings, returns, purchases)
+            self.full_runs += 1
+        else:
+            start = first_changed_year(checkpoint["params"], params)
+            savings, investment_return = checkpoint["savings"].copy(), checkpoint["investment_return"].copy()
+            if start < horizon:
+                initial_savings = savings[:, start - 1] if start > 0 else np.zeros(1)
+                savings[:, start:], investment_return[:, start:] = working_phase_trajectory(
+                    annual_savings[:, start:], returns[:, start:], purchases[:, start:], initial_savings
+                )
+            self.incremental_runs += 1
+
+        with self._lock:
+            self._checkpoints[key] = {"params": params, "savings": savings, "investment_return": investment_return}
+            self._checkpoints.move_to_end(key)
+            while len(self._checkpoints) > self.max_entries:
+                self._checkpoints.popitem(last=False)
+
+        return format_results(ages, annual_income, annual_savings, savings, investment_return,
+                              monthly_expenses, retirement_age, retirement_investment_strategy)
+
+    def stats(self):
+        return {
+            "checkpoints": len(self._checkpoints),
+            "full_runs": self.full_runs,
+            "incremental_runs": self.incremental_runs,
+        }
@@ -89,6 +89,25 @@ class UserBehavior(TaskSet):
                         json=simulation_data,
                         headers={"Content-Type": "application/json"})
     
+    @task(1)
+    def run_simulation_batch(self):
+        batch_data = {
+            "base": {
+                "current_age": random.randint(25, 45),
+                "monthly_income": random.randint(3000, 8000),
+                "retirement_investment_strategy": "conservative"
+            },
+            "grid": {
+                "retirement_age": {"start": 55, "stop": 70},
+                "investment_strategy": ["conservative", "balanced", "aggressive"],
+                "monthly_expenses": {"start": 1500, "stop": 5000, "step": 500}
+            }
+        }
+
+        self.client.post("/run_simulation_batch",
+                        json=batch_data,
+                        headers={"Content-Type": "application/json"})
+
     @task(3)
     def visit_scenario_simulation(self):
         self.client.get("/scenario_simulation")
@@ -8,7 +8,9 @@ from peewee import (
     ForeignKeyField,
     DecimalField,
     IntegerField,
-    DateField
+    DateField,
+    TextField,
+    fn
 )
 
 database = SqliteDatabase("fintwin.db", pragmas={
@@ -50,7 +52,13 @@ class DataOverview(BaseModel):
     bank_name_short = CharField()
     account_type = CharField()
     balance = DecimalField(decimal_places=2)
-    
+
+    class Meta:
+        indexes = (
+            # Uploads upsert accounts on this key
+            (("user", "account_id"), True),
+        )
+
 class DataTransaction(BaseModel):
     transaction_id = AutoField()
     user = ForeignKeyField(User, backref="transaction")
@@ -58,6 +66,14 @@ class DataTransaction(BaseModel):
     date = DateField()
     description = CharField()
     amount = DecimalField(decimal_places=2)
+
+    class Meta:
+        indexes = (
+            # Covers the per-day balance history of an account without touching the table
+            (("bank_account_id", "date", "amount"), False),
+            # Keyset pagination of an account's transactions by (date, transaction_id)
+            (("user", "bank_account_id", "date", "transaction_id"), False),
+        )
     
 class DataInvestment(BaseModel):
     user = ForeignKeyField(User, backref="invest")
@@ -68,9 +84,123 @@ class DataInvestment(BaseModel):
     quantity = IntegerField(null=True)
     amount = DecimalField(decimal_places=2)
     date = DateField()
-    
+
+    class Meta:
+        indexes = (
+            # Uploads upsert investments on this key
+            (("user", "name"), True),
+        )
+
+
+class PortfolioSummary(BaseModel):
+    # Per-user totals by investment type and by bank, rebuilt whenever the user's data is uploaded
+    user = ForeignKeyField(User, backref="portfolio_summary")
+    kind = CharField()
+    name = CharField()
+    total = DecimalField(decimal_places=2, auto_round=True)
+    count = IntegerField()
+
+    class Meta:
+        indexes = (
+            (("user", "kind", "name"), True),
+        )
+
+
+class ImportJob(BaseModel):
+    # Transaction uploads waiting for or being imported by the import workers; the table is the job queue
+    job_id = UUIDField(primary_key=True)
+    user = ForeignKeyField(User, backref="import_jobs")
+    path = CharField()
+    status = CharField(default="queued")
+    rows_processed = IntegerField(default=0)
+    inserted = IntegerField(default=0)
+    skipped = IntegerField(default=0)
+    errors = TextField(default="[]")
+    created_at = DateTimeField()
+    started_at = DateTimeField(null=True)
+    updated_at = DateTimeField(null=True)
+    finished_at = DateTimeField(null=True)
+
+    class Meta:
+        indexes = (
+            (("status", "created_at"), False),
+        )
+
+
+def refresh_portfolio_summary(user):
+    # Call inside the transaction that changed the user's DataInvestment or DataOverview rows. Groups are
+    # stored in order of their first row, the order the charts have always listed them in.
+    invest = (DataInvestment
+              .select(DataInvestment.invest_type, fn.SUM(DataInvestment.amount), fn.COUNT(DataInvestment.id))
+              .where(DataInvestment.user == user)
+              .group_by(DataInvestment.invest_type)
+              .order_by(fn.MIN(DataInvestment.id))
+              .tuples())
+    banks = (DataOverview
+             .select(DataOverview.bank_name, fn.SUM(DataOverview.balance), fn.COUNT(DataOverview.id))
+             .where(DataOverview.user == user)
+             .group_by(DataOverview.bank_name)
+             .order_by(fn.MIN(DataOverview.id))
+             .tuples())
+    rows = [{"user": user, "kind": "invest_type", "name": name, "total": total, "count": count}
+            for name, total, count in invest]
+    rows += [{"user": user, "kind": "bank", "name": name, "total": total, "count": count}
+             for name, total, count in banks]
+
+    PortfolioSummary.delete().where(PortfolioSummary.user == user).execute()
+    if rows:
+        PortfolioSummary.insert_many(rows).execute()
+
+
+def summarize_portfolio(rows):
+    summary = {"invest_totals": {}, "bank_totals": {}, "account_count": 0}
+    for row in rows:
+        if row.kind == "invest_type":
+            summary["invest_totals"][row.name] = row.total
+        else:
+            summary["bank_totals"][row.name] = row.total
+            summary["account_count"] += row.count
+    return summary
+
+
+def deduplicate_uploads():
+    """Merge duplicate accounts and investments left by uploads from before the unique indexes existed.
+
+    Uploads updated the first matching row, so the row with the lowest id is kept. Transactions of a removed
+    account are moved to the kept one. Returns True when any row was removed.
+    """
+    kept_accounts = DataOverview.select(fn.MIN(DataOverview.id)).group_by(DataOverview.user, DataOverview.account_id)
+    Duplicate = DataOverview.alias()
+    Kept = DataOverview.alias()
+    kept_account = (Kept
+                    .select(fn.MIN(Kept.id))
+                    .join(Duplicate, on=(Kept.user == Duplicate.user) & (Kept.account_id == Duplicate.account_id))
+                    .where(Duplicate.id == DataTransaction.bank_account_id))
+    (DataTransaction
+     .update(bank_account_id=kept_account)
+     .where(DataTransaction.bank_account_id.not_in(kept_accounts))
+     .execute())
+    removed = DataOverview.delete().where(DataOverview.id.not_in(kept_accounts)).execute()
+
+    kept_investments = (DataInvestment
+                        .select(fn.MIN(DataInvestment.id))
+                        .group_by(DataInvestment.user, DataInvestment.name))
+    removed += DataInvestment.delete().where(DataInvestment.id.not_in(kept_investments)).execute()
+    return removed > 0
 
 
 def create_tables():
     with database:
-        database.create_tables([User, ChatHistory, DataOverview, DataTransaction, DataInvestment])
+        backfill = not PortfolioSummary.table_exists()
+        if DataOverview.table_exists() and "dataoverview_user_id_account_id" not in {
+            index.name for index in database.get_indexes(DataOverview._meta.table_name)
+        }:
+            with database.atomic():
+                backfill = deduplicate_uploads() or backfill
+        database.create_tables(
+            [User, ChatHistory, DataOverview, DataTransaction, DataInvestment, PortfolioSummary, ImportJob]
+        )
+        if backfill:
+            with database.atomic():
+                for user in User.select():
+                    refresh_portfolio_summary(user)
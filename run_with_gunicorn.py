@@ -1,8 +1,14 @@
 from gunicorn.app.base import BaseApplication
 
+from app import start_chart_workers, start_import_workers
 from wsgi import app
 
 
+def post_fork(server, worker):
+    start_chart_workers()
+    start_import_workers()
+
+
 def run_server():
     class WSGIApplication(BaseApplication):
         def __init__(self, app, options=None):
@@ -27,6 +33,7 @@ def run_server():
         'max_requests': 1000,
         'max_requests_jitter': 200,
         'preload_app': True,
+        'post_fork': post_fork,
     }
     
     WSGIApplication(app, options).run()
@@ -0,0 +1,74 @@
+import gzip
+import json
+import struct
+
+import numpy as np
+
+RESPONSE_FORMATS = ("json", "columnar", "binary")
+BINARY_DTYPES = ("float32", "float64")
+BINARY_MIMETYPE = "application/octet-stream"
+GZIP_MIN_SIZE = 1024  # Smaller bodies are not worth compressing
+GZIP_LEVEL = 5
+
+
+def to_columnar(results):
+    # Turn the per-year lists of dicts of a simulation result into one list per field
+    columnar = dict(results)
+    for phase in ("working_phase", "retirement_phase"):
+        rows = results[phase]
+        fields = rows[0].keys() if rows else []
+        columnar[phase] = {field: [row[field] for row in rows] for field in fields}
+    return columnar
+
+
+def encode_json(results):
+    return json.dumps(results, separators=(",", ":")).encode("utf-8")
+
+
+def encode_binary(results, dtype="float32"):
+    """Encode a columnar result as a JSON header followed by packed little-endian numeric columns.
+
+    Layout: a uint32 header length, the UTF-8 JSON header, padding to a multiple of 8 bytes, then the
+    column buffers back to back. Every list of plain numbers in the result is replaced in the header by
+    {"$column": i}, and header["columns"][i] gives the offset (from the start of the buffers) and length
+    of that column. Anything else (strings, None, nested lists) stays in the JSON header.
+    """
+    if dtype not in BINARY_DTYPES:
+        raise ValueError(f"Binary dtype must be one of {', '.join(BINARY_DTYPES)}")
+    buffers = []
+    columns = []
+    offset = 0
+
+    def pack(value):
+        nonlocal offset
+        if isinstance(value, dict):
+            return {key: pack(item) for key, item in value.items()}
+        if isinstance(value, list) and value and all(
+            isinstance(item, (int, float)) and not isinstance(item, bool) for item in value
+        ):
+            buffer = np.asarray(value, dtype=f"<{'f4' if dtype == 'float32' else 'f8'}").tobytes()
+            columns.append({"offset": offset, "length": len(value)})
+            buffers.append(buffer)
+            offset += len(buffer)
+            return {"$column": len(columns) - 1}
+        return value
+
+    data = pack(results)
+    header = json.dumps({"dtype": dtype, "columns": columns, "data": data}, separators=(",", ":")).encode("utf-8")
+    header += b" " * (-(len(header) + 4) % 8)
+    return struct.pack("<I", len(header)) + header + b"".join(buffers)
+
+
+def encode_results(results, response_format, dtype="float32"):
+    # Returns (body, mimetype) for a simulation result in the requested format
+    if response_format == "json":
+        return encode_json(results), "application/json"
+    if response_format == "columnar":
+        return encode_json(to_columnar(results)), "application/json"
+    if response_format == "binary":
+        return encode_binary(to_columnar(results), dtype), BINARY_MIMETYPE
+    raise ValueError(f"Response format must be one of {', '.join(RESPONSE_FORMATS)}")
+
+
+def compress(body):
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
@@ -1,8 +1,48 @@
-def simulate_retirement(current_age, retirement_age, monthly_income, monthly_expenses, 
-                        monthly_savings, investment_strategy, investment_increase=0,
-                        career_switch_impact=0, purchase_amount=0, career_switch_age=0, purchase_age=0,
-                        retirement_investment_strategy="null"):
-    # Input validations
+import itertools
+import math
+
+import numpy as np
+
+
+annual_return_rates = {
+    "null": 0.0,           # No investment
+    "conservative": 0.04,  # 4%
+    "balanced": 0.06,      # 6%
+    "aggressive": 0.08     # 8%
+}
+
+# Yearly volatility of returns for each strategy, used by the Monte Carlo mode
+return_volatilities = {
+    "null": 0.0,
+    "conservative": 0.05,
+    "balanced": 0.10,
+    "aggressive": 0.15
+}
+
+RETIREMENT_YEARS = 30  # Suppose simulation for 30 years after retirement
+RETIREMENT_EXPENSE_RATIO = 0.8  # Suppose 80% of pre-retirement expenses
+
+SIMULATION_ENGINES = ("python", "numpy", "monthly")
+
+GOAL_SEEK_TARGETS = ("monthly_expenses", "monthly_income", "retirement_age")
+GOAL_SEEK_POINTS = 32  # Candidates evaluated together in each round of the search
+GOAL_SEEK_TOLERANCE = 0.01
+
+MONTE_CARLO_BLOCK_SIZE = 1000  # Paths drawn from each independently seeded random stream
+MONTE_CARLO_PERCENTILES = (10, 25, 50, 75, 90)
+MINIMUM_ANNUAL_RETURN = -0.95
+
+SIMULATION_PARAMETERS = (
+    "current_age", "retirement_age", "monthly_income", "monthly_expenses", "monthly_savings",
+    "investment_strategy", "investment_increase", "career_switch_impact", "purchase_amount",
+    "career_switch_age", "purchase_age", "retirement_investment_strategy"
+)
+
+
+def validate_inputs(current_age, retirement_age, monthly_income, monthly_expenses,
+                    monthly_savings, investment_strategy, investment_increase=0,
+                    career_switch_impact=0, purchase_amount=0, career_switch_age=0, purchase_age=0,
+                    retirement_investment_strategy="null"):
     if not (18 <= current_age <= 100):
         raise ValueError("Current Age must be between 18 and 100")
     
@@ -43,13 +83,31 @@ def simulate_retirement(current_age, retirement_age, monthly_income, monthly_exp
     if (purchase_age == 0 and purchase_amount != 0) or (purchase_age != 0 and purchase_amount == 0):
         raise ValueError("Age of House Purchase and Purchase Amount for House must both be specified or both be zero")
 
-    annual_return_rates = {
-        "null": 0.0,           # No investment
-        "conservative": 0.04,  # 4%
-        "balanced": 0.06,      # 6%
-        "aggressive": 0.08     # 8%
-    }
-    
+
+def simulate_retirement(current_age, retirement_age, monthly_income, monthly_expenses, 
+                        monthly_savings, investment_strategy, investment_increase=0,
+                        career_switch_impact=0, purchase_amount=0, career_switch_age=0, purchase_age=0,
+                        retirement_investment_strategy="null", engine="python", career_switch_month=1,
+                        purchase_month=1):
+    # Input validations
+    validate_inputs(current_age, retirement_age, monthly_income, monthly_expenses,
+                    monthly_savings, investment_strategy, investment_increase,
+                    career_switch_impact, purchase_amount, career_switch_age, purchase_age,
+                    retirement_investment_strategy)
+
+    if engine == "numpy":
+        return simulate_retirement_numpy(current_age, retirement_age, monthly_income, monthly_expenses,
+                                         investment_strategy, investment_increase,
+                                         career_switch_impact, purchase_amount, career_switch_age, purchase_age,
+                                         retirement_investment_strategy)
+    if engine == "monthly":
+        return simulate_retirement_monthly(current_age, retirement_age, monthly_income, monthly_expenses,
+                                           investment_strategy, investment_increase,
+                                           career_switch_impact, purchase_amount, career_switch_age, purchase_age,
+                                           retirement_investment_strategy, career_switch_month, purchase_month)
+    if engine != "python":
+        raise ValueError(f"Simulation engine must be one of {', '.join(SIMULATION_ENGINES)}")
+
     annual_return = annual_return_rates.get(investment_strategy, 0.06)
     retirement_annual_return = annual_return_rates.get(retirement_investment_strategy, 0.04)
     
@@ -93,8 +151,8 @@ def simulate_retirement(current_age, retirement_age, monthly_income, monthly_exp
             "annual_savings": round(annual_savings, 2)
         })
     
-    retirement_years = 30  # Suppose simulation for 30 years after retirement
-    retirement_annual_expenses = annual_expenses * 0.8  # Suppose 80% of pre-retirement expenses
+    retirement_years = RETIREMENT_YEARS
+    retirement_annual_expenses = annual_expenses * RETIREMENT_EXPENSE_RATIO
     retirement_results = []
     
     retirement_savings = total_savings
@@ -121,6 +179,628 @@ def simulate_retirement(current_age, retirement_age, monthly_income, monthly_exp
         "summary": generate_summary(yearly_results, retirement_results, retirement_age)
     }
 
+def simulate_retirement_numpy(current_age, retirement_age, monthly_income, monthly_expenses,
+                              investment_strategy, investment_increase=0,
+                              career_switch_impact=0, purchase_amount=0, career_switch_age=0, purchase_age=0,
+                              retirement_investment_strategy="null", retirement_years=RETIREMENT_YEARS):
+    # Same model as the loop in simulate_retirement, solved as array recurrences over the whole horizon
+    params = scenario_arrays(current_age, retirement_age, monthly_income, monthly_expenses, investment_strategy,
+                             investment_increase, career_switch_impact, purchase_amount, career_switch_age,
+                             purchase_age)
+    ages, annual_income, annual_savings, returns, purchases = working_phase_inputs(params, retirement_age - current_age)
+    savings, investment_return = working_phase_trajectory(annual_savings, returns, purchases)
+    return format_results(ages, annual_income, annual_savings, savings, investment_return,
+                          monthly_expenses, retirement_age, retirement_investment_strategy, retirement_years)
+
+
+def simulate_retirement_monthly(current_age, retirement_age, monthly_income, monthly_expenses,
+                                investment_strategy, investment_increase=0,
+                                career_switch_impact=0, purchase_amount=0, career_switch_age=0, purchase_age=0,
+                                retirement_investment_strategy="null", career_switch_month=1, purchase_month=1):
+    """Simulate month by month, with returns compounded monthly and events in a given month (1-12) of the year.
+
+    Monthly rates are the equivalent of the yearly ones, so a balance left untouched grows by the same amount
+    over a year. Results are reported per year in the same shape as the yearly engines.
+    """
+    if not (1 <= career_switch_month <= 12) or not (1 <= purchase_month <= 12):
+        raise ValueError("Month of Career Switch and Month of House Purchase must be between 1 and 12")
+
+    working_years = retirement_age - current_age
+    month = np.arange(working_years * 12)
+    ages = current_age + month // 12
+    month_of_year = month % 12 + 1
+
+    income = np.full(month.shape, float(monthly_income))
+    if career_switch_impact != 0 and career_switch_age >= current_age:
+        switched = (ages > career_switch_age) | ((ages == career_switch_age) & (month_of_year >= career_switch_month))
+        income[switched] += career_switch_impact / 12
+    monthly_savings = income - monthly_expenses
+
+    annual_return = annual_return_rates[investment_strategy]
+    if investment_increase > 0:
+        annual_rates = annual_return * (1 + (investment_increase / 100) * (month / 12 / working_years))
+    else:
+        annual_rates = np.full(month.shape, annual_return)
+    returns = (1 + annual_rates) ** (1 / 12) - 1
+
+    purchases = np.zeros(month.shape)
+    if purchase_amount > 0:
+        purchases[(ages == purchase_age) & (month_of_year == purchase_month)] = purchase_amount
+
+    savings, investment_return = working_phase_trajectory(
+        monthly_savings[None, :], returns[None, :], purchases[None, :]
+    )
+
+    retirement_monthly_expenses = monthly_expenses * RETIREMENT_EXPENSE_RATIO
+    retirement_rate = (1 + annual_return_rates[retirement_investment_strategy]) ** (1 / 12) - 1
+    retirement_savings, retirement_return = retirement_phase_trajectory(
+        savings[:, -1], np.full((1, RETIREMENT_YEARS * 12), retirement_rate), np.array([retirement_monthly_expenses])
+    )
+    months_covered = int(retirement_years_covered(retirement_savings)[0])
+    depleted = retirement_savings[0, months_covered - 1] <= 0
+    years_covered = (months_covered - 1) // 12 + 1
+
+    def yearly(values, total=True):
+        values = values.reshape(-1, 12)
+        return np.round(values.sum(axis=1) if total else values[:, -1], 2).tolist()
+
+    annual_expenses = round(monthly_expenses * 12, 2)
+    yearly_results = [
+        {
+            "age": current_age + year,
+            "savings": row_savings,
+            "annual_income": row_income,
+            "annual_expenses": annual_expenses,
+            "investment_return": row_return,
+            "annual_savings": row_annual_savings
+        }
+        for year, (row_savings, row_income, row_return, row_annual_savings) in enumerate(zip(
+            yearly(savings[0], total=False), yearly(income), yearly(investment_return[0]), yearly(monthly_savings)
+        ))
+    ]
+
+    # The year the savings run out ends on the month they do, like the yearly engines
+    retirement_months = years_covered * 12
+    retirement_savings = retirement_savings[0, :retirement_months].copy()
+    retirement_return = retirement_return[0, :retirement_months].copy()
+    if depleted:
+        retirement_savings[-1] = retirement_savings[months_covered - 1]
+        retirement_return[months_covered:] = 0
+    retirement_annual_expenses = round(retirement_monthly_expenses * 12, 2)
+    retirement_results = [
+        {
+            "age": retirement_age + year,
+            "savings": row_savings,
+            "annual_expenses": retirement_annual_expenses,
+            "investment_return": row_return
+        }
+        for year, (row_savings, row_return) in enumerate(zip(
+            yearly(retirement_savings, total=False), yearly(retirement_return)
+        ))
+    ]
+
+    return {
+        "working_phase": yearly_results,
+        "retirement_phase": retirement_results,
+        "total_retirement_savings": yearly_results[-1]["savings"] if yearly_results else 0,
+        "retirement_funds_depletion_age": retirement_age + years_covered - 1 if depleted else None,
+        "summary": generate_summary(yearly_results, retirement_results, retirement_age)
+    }
+
+
+def scenario_arrays(current_age, retirement_age, monthly_income, monthly_expenses, investment_strategy,
+                    investment_increase=0, career_switch_impact=0, purchase_amount=0, career_switch_age=0,
+                    purchase_age=0):
+    # Inputs of a single scenario in the form working_phase_inputs expects
+    return {
+        "current_age": np.array([current_age]),
+        "retirement_age": np.array([retirement_age]),
+        "monthly_income": np.array([monthly_income], dtype=float),
+        "monthly_expenses": np.array([monthly_expenses], dtype=float),
+        "annual_return": np.array([annual_return_rates[investment_strategy]]),
+        "investment_increase": np.array([investment_increase], dtype=float),
+        "career_switch_impact": np.array([career_switch_impact], dtype=float),
+        "purchase_amount": np.array([purchase_amount], dtype=float),
+        "career_switch_age": np.array([career_switch_age]),
+        "purchase_age": np.array([purchase_age]),
+    }
+
+
+def format_results(ages, annual_income, annual_savings, savings, investment_return,
+                   monthly_expenses, retirement_age, retirement_investment_strategy,
+                   retirement_years=RETIREMENT_YEARS):
+    # Run the retirement phase after a single-row working phase and build the simulate_retirement response
+    annual_expenses = monthly_expenses * 12
+    retirement_annual_expenses = annual_expenses * RETIREMENT_EXPENSE_RATIO
+    retirement_returns = np.full((1, retirement_years), annual_return_rates[retirement_investment_strategy])
+    retirement_savings, retirement_return = retirement_phase_trajectory(
+        savings[:, -1], retirement_returns, np.array([retirement_annual_expenses])
+    )
+    years_covered = int(retirement_years_covered(retirement_savings)[0])
+
+    working_rows = np.round(np.concatenate([savings, annual_income, investment_return, annual_savings]), 2).tolist()
+    rounded_expenses = round(annual_expenses, 2)
+    yearly_results = [
+        {
+            "age": age,
+            "savings": row_savings,
+            "annual_income": row_income,
+            "annual_expenses": rounded_expenses,
+            "investment_return": row_return,
+            "annual_savings": row_annual_savings
+        }
+        for age, row_savings, row_income, row_return, row_annual_savings in zip(ages[0].tolist(), *working_rows)
+    ]
+
+    retirement_rows = np.round(
+        np.concatenate([retirement_savings[:, :years_covered], retirement_return[:, :years_covered]]), 2
+    ).tolist()
+    rounded_retirement_expenses = round(retirement_annual_expenses, 2)
+    retirement_results = [
+        {
+            "age": retirement_age + year,
+            "savings": row_savings,
+            "annual_expenses": rounded_retirement_expenses,
+            "investment_return": row_return
+        }
+        for year, (row_savings, row_return) in enumerate(zip(*retirement_rows))
+    ]
+
+    depleted = retirement_savings[0, years_covered - 1] <= 0
+    return {
+        "working_phase": yearly_results,
+        "retirement_phase": retirement_results,
+        "total_retirement_savings": yearly_results[-1]["savings"] if yearly_results else 0,
+        "retirement_funds_depletion_age": retirement_age + years_covered - 1 if depleted else None,
+        "summary": generate_summary(yearly_results, retirement_results, retirement_age)
+    }
+
+
+def expand_grid(base, grid, max_scenarios=None):
+    # Cartesian product of the grid values over the base parameters; a value may be a list or an
+    # inclusive {"start", "stop", "step"} range
+    names = list(grid)
+    counts = []
+    for name in names:
+        values = grid[name]
+        if isinstance(values, dict):
+            start, stop, step = values["start"], values["stop"], values.get("step", 1)
+            if step <= 0:
+                raise ValueError(f"Grid step for {name} must be positive")
+            count = max(int(round((stop - start) / step)) + 1, 0)
+        else:
+            count = len(values)
+        if count == 0:
+            raise ValueError(f"Grid values for {name} cannot be empty")
+        counts.append(count)
+    # Ranges are only built once the number of scenarios is known to be within the limit
+    if max_scenarios is not None and math.prod(counts) > max_scenarios:
+        raise ValueError(f"A batch cannot contain more than {max_scenarios} scenarios")
+
+    axes = []
+    for name, count in zip(names, counts):
+        values = grid[name]
+        if isinstance(values, dict):
+            start, step = values["start"], values.get("step", 1)
+            values = [start + i * step for i in range(count)]
+        axes.append(values)
+    return [{**base, **dict(zip(names, combination))} for combination in itertools.product(*axes)]
+
+
+def validate_scenarios(scenarios):
+    for i, scenario in enumerate(scenarios):
+        try:
+            validate_inputs(**scenario)
+        except ValueError as e:
+            raise ValueError(f"Scenario {i}: {e}")
+
+
+def simulate_batch(scenarios, include_trajectories=False):
+    # Run every scenario in one vectorised pass and return the results column by column
+    validate_scenarios(scenarios)
+
+    columns = {name: [scenario.get(name, 0) for scenario in scenarios] for name in SIMULATION_PARAMETERS}
+    columns["investment_strategy"] = [scenario["investment_strategy"] for scenario in scenarios]
+    columns["retirement_investment_strategy"] = [
+        scenario.get("retirement_investment_strategy", "null") for scenario in scenarios
+    ]
+    trajectories = batch_trajectories(columns)
+    working_years = trajectories["working_years"]
+    years_covered = trajectories["years_covered"]
+
+    results = {
+        "count": len(scenarios),
+        "parameters": columns,
+        "total_retirement_savings": np.round(trajectories["final_savings"], 2).tolist(),
+        "retirement_years_covered": years_covered.tolist(),
+        "retirement_funds_depletion_age": [
+            age if is_depleted else None
+            for age, is_depleted in zip(
+                (trajectories["retirement_age"] + years_covered - 1).tolist(), trajectories["depleted"].tolist()
+            )
+        ],
+    }
+    if include_trajectories:
+        working_savings = np.round(trajectories["savings"], 2).tolist()
+        retirement_rows = np.round(trajectories["retirement_savings"], 2).tolist()
+        results["working_savings"] = [row[:years] for row, years in zip(working_savings, working_years.tolist())]
+        results["retirement_savings"] = [row[:years] for row, years in zip(retirement_rows, years_covered.tolist())]
+    return results
+
+
+def batch_trajectories(columns, retirement_years=RETIREMENT_YEARS):
+    # columns maps every simulation parameter to a list or array with one entry per scenario
+    params = {
+        name: np.asarray(columns[name], dtype=float)
+        for name in ("monthly_income", "monthly_expenses", "investment_increase",
+                     "career_switch_impact", "purchase_amount")
+    }
+    params.update({
+        name: np.asarray(columns[name], dtype=int)
+        for name in ("current_age", "retirement_age", "career_switch_age", "purchase_age")
+    })
+    params["annual_return"] = np.array([annual_return_rates[s] for s in columns["investment_strategy"]])
+
+    working_years = params["retirement_age"] - params["current_age"]
+    ages, annual_income, annual_savings, returns, purchases = working_phase_inputs(params, working_years.max())
+    savings, investment_return = working_phase_trajectory(annual_savings, returns, purchases)
+    rows = np.arange(len(working_years))
+    final_savings = savings[rows, working_years - 1]
+
+    retirement_annual_expenses = params["monthly_expenses"] * 12 * RETIREMENT_EXPENSE_RATIO
+    retirement_returns = np.array([annual_return_rates[s] for s in columns["retirement_investment_strategy"]])
+    retirement_savings, retirement_return = retirement_phase_trajectory(
+        final_savings, np.repeat(retirement_returns[:, None], retirement_years, axis=1), retirement_annual_expenses
+    )
+    years_covered = retirement_years_covered(retirement_savings)
+
+    return {
+        "current_age": params["current_age"],
+        "retirement_age": params["retirement_age"],
+        "working_years": working_years,
+        "savings": savings,
+        "final_savings": final_savings,
+        "retirement_savings": retirement_savings,
+        "years_covered": years_covered,
+        "depleted": retirement_savings[rows, years_covered - 1] <= 0,
+    }
+
+
+def savings_positive_through(trajectories, target_age):
+    # Whether each scenario keeps its savings above zero at every simulated age up to target_age
+    working_columns = np.arange(trajectories["savings"].shape[1])
+    working_ages = trajectories["current_age"][:, None] + working_columns
+    working_failed = (
+        (trajectories["savings"] <= 0)
+        & (working_columns < trajectories["working_years"][:, None])
+        & (working_ages <= target_age)
+    )
+
+    retirement_years = trajectories["retirement_savings"].shape[1]
+    retirement_columns = np.arange(retirement_years)
+    retirement_ages = trajectories["retirement_age"][:, None] + retirement_columns
+    retirement_failed = (
+        (trajectories["retirement_savings"] <= 0)
+        & (retirement_columns < trajectories["years_covered"][:, None])
+        & (retirement_ages <= target_age)
+    )
+
+    covered = trajectories["retirement_age"] + retirement_years - 1 >= target_age
+    return covered & ~working_failed.any(axis=1) & ~retirement_failed.any(axis=1)
+
+
+def goal_seek(target, scenario, target_age=90):
+    """Find the value of one input that keeps savings positive up to target_age.
+
+    Solves for the highest monthly_expenses, the lowest monthly_income or the earliest retirement_age.
+    Each round evaluates GOAL_SEEK_POINTS candidates in a single batch and narrows the bracket to the
+    interval where the outcome flips, so a cent-level answer takes only a handful of evaluations.
+    """
+    validate_inputs(**scenario)
+    if target not in GOAL_SEEK_TARGETS:
+        raise ValueError(f"Goal seek target must be one of {', '.join(GOAL_SEEK_TARGETS)}")
+    if target_age <= scenario["current_age"]:
+        raise ValueError("Target Age must be greater than Current Age")
+    horizon_end = scenario["retirement_age"] + RETIREMENT_YEARS - 1
+    if target != "retirement_age" and target_age > horizon_end:
+        raise ValueError(f"Target Age cannot be later than the end of the simulation (age {horizon_end})")
+
+    evaluations = 0
+    # The retirement age target moves the start of retirement, so its retirement phase runs up to target_age
+    # instead of the usual RETIREMENT_YEARS, which would otherwise decide the answer on its own
+    retirement_years = target_age - scenario["current_age"] if target == "retirement_age" else RETIREMENT_YEARS
+
+    def evaluate(values):
+        nonlocal evaluations
+        evaluations += 1
+        columns = {name: [scenario[name]] * len(values) for name in SIMULATION_PARAMETERS}
+        columns[target] = values
+        return savings_positive_through(batch_trajectories(columns, retirement_years), target_age)
+
+    if target == "retirement_age":
+        candidates = np.arange(scenario["current_age"] + 1, 101)
+        feasible = evaluate(candidates)
+        value = int(candidates[feasible.argmax()]) if feasible.any() else None
+    elif target == "monthly_expenses":
+        # Spending the whole income, including a raise from a career switch, leaves nothing to save,
+        # so the answer lies below it
+        highest_income = scenario["monthly_income"] + max(scenario["career_switch_impact"], 0) / 12
+        value = None
+        if evaluate(np.array([0.0]))[0]:
+            value = search_boundary(evaluate, 0.0, float(highest_income), feasible_below=True)
+    else:
+        # Double the income until the scenario works, then search the last doubling
+        upper = max(float(scenario["monthly_expenses"]), 1.0) * 2.0 ** np.arange(40)
+        candidates = np.concatenate([[0.0], upper])
+        feasible = evaluate(candidates)
+        value = None
+        if feasible[0]:
+            value = 0.0
+        elif feasible.any():
+            first = feasible.argmax()
+            value = search_boundary(evaluate, candidates[first - 1], candidates[first], feasible_below=False)
+
+    solved = dict(scenario)
+    simulation = None
+    if value is not None:
+        solved[target] = value
+        # Run the retirement phase at least up to target_age, the horizon the solver checked, so that the
+        # simulation shows the goal being met
+        params = {name: solved[name] for name in SIMULATION_PARAMETERS if name != "monthly_savings"}
+        retirement_years = max(RETIREMENT_YEARS, target_age - solved["retirement_age"] + 1)
+        simulation = simulate_retirement_numpy(**params, retirement_years=retirement_years)
+    return {
+        "target": target,
+        "target_age": target_age,
+        "value": value,
+        "achievable": value is not None,
+        "evaluations": evaluations,
+        "monthly_savings": round(solved["monthly_income"] - solved["monthly_expenses"], 2),
+        "simulation": simulation,
+    }
+
+
+def search_boundary(evaluate, low, high, feasible_below):
+    # Narrow [low, high] around the point where evaluate flips; the feasible end is always kept in the bracket
+    while high - low > GOAL_SEEK_TOLERANCE:
+        candidates = np.linspace(low, high, GOAL_SEEK_POINTS)
+        feasible = evaluate(candidates)
+        if feasible_below:
+            flip = (~feasible).argmax()
+        else:
+            flip = feasible.argmax()
+        low, high = candidates[flip - 1], candidates[flip]
+    # Round to whole cents towards the feasible end of the bracket; the cent beyond it may still be
+    # feasible, as the bracket is narrower than a cent but need not start on one
+    if feasible_below:
+        value, step = np.floor(low * 100) / 100, 0.01
+    else:
+        value, step = np.ceil(high * 100) / 100, -0.01
+    if evaluate(np.array([round(value + step, 2)]))[0]:
+        value = round(value + step, 2)
+    return float(value)
+
+
+def simulate_monte_carlo(current_age, retirement_age, monthly_income, monthly_expenses,
+                         monthly_savings, investment_strategy, investment_increase=0,
+                         career_switch_impact=0, purchase_amount=0, career_switch_age=0, purchase_age=0,
+                         retirement_investment_strategy="null", n_paths=10000, seed=None,
+                         percentiles=MONTE_CARLO_PERCENTILES):
+    scenario = {
+        "current_age": current_age,
+        "retirement_age": retirement_age,
+        "monthly_income": monthly_income,
+        "monthly_expenses": monthly_expenses,
+        "monthly_savings": monthly_savings,
+        "investment_strategy": investment_strategy,
+        "investment_increase": investment_increase,
+        "career_switch_impact": career_switch_impact,
+        "purchase_amount": purchase_amount,
+        "career_switch_age": career_switch_age,
+        "purchase_age": purchase_age,
+        "retirement_investment_strategy": retirement_investment_strategy,
+    }
+    seed = prepare_monte_carlo(scenario, n_paths, seed)
+    working_savings, retirement_savings = run_monte_carlo_blocks(scenario, seed, monte_carlo_blocks(n_paths))
+    return summarize_monte_carlo(scenario, working_savings, retirement_savings, seed, percentiles)
+
+
+def prepare_monte_carlo(scenario, n_paths, seed=None):
+    # Validate a Monte Carlo request and return the seed to use, drawing a fresh one if none was given
+    validate_inputs(**scenario)
+    if n_paths < 1:
+        raise ValueError("Number of paths must be at least 1")
+    if seed is None:
+        seed = int(np.random.SeedSequence().generate_state(1)[0])
+    return seed
+
+
+def monte_carlo_blocks(n_paths):
+    # (block index, number of paths) for every block needed to draw n_paths paths
+    return [
+        (block, min(MONTE_CARLO_BLOCK_SIZE, n_paths - start))
+        for block, start in enumerate(range(0, n_paths, MONTE_CARLO_BLOCK_SIZE))
+    ]
+
+
+def run_monte_carlo_blocks(scenario, seed, blocks):
+    results = [monte_carlo_block(scenario, seed, block, size) for block, size in blocks]
+    return np.concatenate([r[0] for r in results]), np.concatenate([r[1] for r in results])
+
+
+def monte_carlo_block(scenario, seed, block, n_paths):
+    # Paths of one block depend only on (seed, block), so results do not change with how blocks are scheduled
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(block,)))
+    working_years = scenario["retirement_age"] - scenario["current_age"]
+
+    params = {name: np.array([scenario[name]]) for name in SIMULATION_PARAMETERS if "strategy" not in name}
+    params["annual_return"] = np.array([annual_return_rates[scenario["investment_strategy"]]])
+    _, _, annual_savings, expected_returns, purchases = working_phase_inputs(params, working_years)
+
+    volatility = return_volatilities[scenario["investment_strategy"]]
+    returns = expected_returns + volatility * rng.standard_normal((n_paths, working_years))
+    np.maximum(returns, MINIMUM_ANNUAL_RETURN, out=returns)
+    shape = returns.shape
+    savings, _ = working_phase_trajectory(
+        np.broadcast_to(annual_savings, shape), returns, np.broadcast_to(purchases, shape)
+    )
+
+    retirement_strategy = scenario["retirement_investment_strategy"]
+    retirement_returns = annual_return_rates[retirement_strategy] + return_volatilities[retirement_strategy] * (
+        rng.standard_normal((n_paths, RETIREMENT_YEARS))
+    )
+    np.maximum(retirement_returns, MINIMUM_ANNUAL_RETURN, out=retirement_returns)
+    retirement_annual_expenses = scenario["monthly_expenses"] * 12 * RETIREMENT_EXPENSE_RATIO
+    retirement_savings, _ = retirement_phase_trajectory(
+        savings[:, -1], retirement_returns, np.full(n_paths, retirement_annual_expenses)
+    )
+    return savings, retirement_savings
+
+
+def summarize_monte_carlo(scenario, working_savings, retirement_savings, seed, percentiles=MONTE_CARLO_PERCENTILES):
+    n_paths = working_savings.shape[0]
+    retirement_age = scenario["retirement_age"]
+
+    depleted = retirement_savings <= 0
+    ruined = depleted.any(axis=1)
+    # A path stops at the first year its savings run out, like the deterministic simulation does
+    retirement_savings = np.where(np.logical_or.accumulate(depleted, axis=1), 0.0, retirement_savings)
+    depletion_ages = retirement_age + depleted.argmax(axis=1)[ruined]
+
+    savings = np.concatenate([working_savings, retirement_savings], axis=1)
+    bands = np.round(np.percentile(savings, percentiles, axis=0), 2)
+    final_savings = np.round(np.percentile(working_savings[:, -1], percentiles), 2)
+
+    return {
+        "n_paths": n_paths,
+        "seed": seed,
+        "ages": list(range(scenario["current_age"], retirement_age + RETIREMENT_YEARS)),
+        "retirement_age": retirement_age,
+        "percentiles": {f"p{p}": band for p, band in zip(percentiles, bands.tolist())},
+        "total_retirement_savings": {f"p{p}": value for p, value in zip(percentiles, final_savings.tolist())},
+        "probability_of_ruin": round(float(ruined.mean()), 4),
+        "median_depletion_age": float(np.median(depletion_ages)) if ruined.any() else None,
+        "partial": False,
+    }
+
+
+def working_phase_inputs(params, horizon):
+    # params maps each input to a 1-D array with one entry per scenario; the strategy is given as its
+    # annual_return rate. Rows shorter than the horizon are padded with zeros.
+    current_age = params["current_age"][:, None]
+    working_years = params["retirement_age"][:, None] - current_age
+    career_switch_age = params["career_switch_age"][:, None]
+    career_switch_impact = params["career_switch_impact"][:, None]
+    purchase_age = params["purchase_age"][:, None]
+    purchase_amount = params["purchase_amount"][:, None]
+    investment_increase = params["investment_increase"][:, None]
+    annual_return = params["annual_return"][:, None]
+
+    year = np.arange(horizon)
+    ages = current_age + year
+
+    annual_income = params["monthly_income"][:, None] * 12
+    switched = (ages >= career_switch_age) & (career_switch_age >= current_age)
+    switched &= (career_switch_impact != 0) & (career_switch_age != 0)
+    annual_income = np.where(switched, annual_income + career_switch_impact, annual_income)
+    annual_savings = (annual_income / 12 - params["monthly_expenses"][:, None]) * 12
+
+    if (investment_increase > 0).any():
+        ramp = 1 + (investment_increase / 100) * (year / working_years)
+        returns = np.where(investment_increase > 0, annual_return * ramp, annual_return)
+    else:
+        returns = np.broadcast_to(annual_return, ages.shape)
+
+    bought = (ages == purchase_age) & (purchase_amount > 0) & (purchase_age != 0)
+    purchases = np.where(bought, purchase_amount, 0.0)
+
+    columns = (annual_income, annual_savings, returns, purchases)
+    if (working_years == horizon).all():
+        return (ages,) + columns
+    valid = year < working_years
+    return (ages,) + tuple(np.where(valid, column, 0.0) for column in columns)
+
+
+def working_phase_trajectory(annual_savings, returns, purchases, initial_savings=None):
+    """Solve savings[k] = (savings[k-1] + annual_savings[k]) * (1 + returns[k]) - purchases[k] for every row.
+
+    Returns are only earned while the balance after saving is positive, so each row alternates between a
+    compounding and a non-compounding regime. Each regime is a closed-form cumulative product/sum, and the
+    rows are advanced regime by regime until every column is resolved.
+    """
+    rows, horizon = annual_savings.shape
+    columns = np.arange(horizon)
+    growth = np.cumprod(1 + returns, axis=1)
+    growth_before = np.concatenate([np.ones((rows, 1)), growth[:, :-1]], axis=1)
+    compounding_terms = annual_savings / growth_before - purchases / growth
+    flat_terms = annual_savings - purchases
+
+    carry = np.zeros(rows) if initial_savings is None else np.asarray(initial_savings, dtype=float).copy()
+
+    # Fast path: the balance stays positive throughout, so every row compounds from the first year
+    savings = growth * (carry[:, None] + np.cumsum(compounding_terms, axis=1))
+    balance = np.concatenate([carry[:, None], savings[:, :-1]], axis=1) + annual_savings
+    if (balance > 0).all():
+        return savings, balance * returns
+
+    investment_return = np.zeros((rows, horizon))
+    start = np.zeros(rows, dtype=int)
+    compounding = np.ones(rows, dtype=bool)
+    all_rows = np.arange(rows)
+
+    while True:
+        active = all_rows[start < horizon]
+        if active.size == 0:
+            break
+        first = start[active]
+        before = columns < first[:, None]
+
+        candidate = np.empty((active.size, horizon))
+        grows = compounding[active]
+        if grows.any():
+            base = carry[active][grows] / growth_before[active[grows], first[grows]]
+            terms = np.where(before[grows], 0.0, compounding_terms[active[grows]])
+            candidate[grows] = growth[active[grows]] * (base[:, None] + np.cumsum(terms, axis=1))
+        if not grows.all():
+            terms = np.where(before[~grows], 0.0, flat_terms[active[~grows]])
+            candidate[~grows] = carry[active][~grows, None] + np.cumsum(terms, axis=1)
+
+        previous = np.concatenate([np.zeros((active.size, 1)), candidate[:, :-1]], axis=1)
+        previous[np.arange(active.size), first] = carry[active]
+        balance = previous + annual_savings[active]
+        consistent = np.where(grows[:, None], balance > 0, balance <= 0) | before
+
+        broken = ~consistent
+        stop = np.where(broken.any(axis=1), broken.argmax(axis=1), horizon)
+        resolved = ~before & (columns < stop[:, None])
+        savings[active] = np.where(resolved, candidate, savings[active])
+        investment_return[active] = np.where(
+            resolved & grows[:, None], balance * returns[active], investment_return[active]
+        )
+
+        advanced = stop > first
+        carry[active[advanced]] = candidate[advanced, stop[advanced] - 1]
+        start[active] = stop
+        compounding[active] = ~grows
+
+    return savings, investment_return
+
+
+def retirement_phase_trajectory(initial_savings, returns, annual_expenses):
+    """Solve savings[k] = savings[k-1] * (1 + returns[k]) - annual_expenses for every row."""
+    growth = np.cumprod(1 + returns, axis=1)
+    savings = growth * (initial_savings[:, None] - np.cumsum(annual_expenses[:, None] / growth, axis=1))
+    previous = np.concatenate([initial_savings[:, None], savings[:, :-1]], axis=1)
+    return savings, previous * returns
+
+
+def retirement_years_covered(retirement_savings):
+    # Years simulated before (and including) the first year the savings run out
+    depleted = retirement_savings <= 0
+    horizon = retirement_savings.shape[1]
+    return np.where(depleted.any(axis=1), depleted.argmax(axis=1) + 1, horizon)
+
+
 def generate_summary(working_results, retirement_results, retirement_age):
     retirement_savings = working_results[-1]["savings"] if working_results else 0
     retirement_years_covered = len(retirement_results)
@@ -0,0 +1,137 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from peewee import BlobField, CharField, FloatField, Model, SqliteDatabase
+
+# Bump whenever simulation results change so that stale entries in the shared tier are never served
+CACHE_VERSION = 1
+
+cache_database = SqliteDatabase("simulation_cache.db", pragmas={
+    'journal_mode': 'wal',
+    'synchronous': 0,
+    'busy_timeout': 1000
+})
+
+
+class CacheEntry(Model):
+    key = CharField(primary_key=True)
+    value = BlobField()
+    expires_at = FloatField(index=True)
+
+    class Meta:
+        database = cache_database
+
+
+def normalize_params(params):
+    # 5000, 5000.0 and "5000" must map to the same key
+    normalized = {}
+    for name, value in params.items():
+        if isinstance(value, bool) or value is None:
+            normalized[name] = value
+        elif isinstance(value, (int, float)):
+            value = round(float(value), 6)
+            normalized[name] = int(value) if value.is_integer() else value
+        else:
+            normalized[name] = str(value)
+    return normalized
+
+
+class SimulationCache:
+    """Two-tier cache of serialized simulation responses.
+
+    The first tier is an in-process LRU with a TTL; the second is a SQLite file shared by every worker
+    process on the host, so a scenario computed by one Gunicorn worker is served by all of them.
+    """
+
+    def __init__(self, max_entries=1024, ttl=3600, shared=True, max_shared_entries=100000):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.shared = shared
+        self.max_shared_entries = max_shared_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.memory_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+        if shared:
+            with cache_database.connection_context():
+                cache_database.create_tables([CacheEntry])
+
+    def key(self, namespace, params):
+        payload = json.dumps([CACHE_VERSION, namespace, normalize_params(params)], sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.memory_hits += 1
+                    return value
+                del self._entries[key]
+
+        if self.shared:
+            with cache_database.connection_context():
+                entry = CacheEntry.get_or_none((CacheEntry.key == key) & (CacheEntry.expires_at > now))
+            if entry is not None:
+                value = bytes(entry.value)
+                self._remember(key, value, entry.expires_at)
+                with self._lock:
+                    self.shared_hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key, value):
+        expires_at = time.time() + self.ttl
+        self._remember(key, value, expires_at)
+
+        if self.shared:
+            with cache_database.connection_context():
+                CacheEntry.replace(key=key, value=value, expires_at=expires_at).execute()
+                self._writes += 1
+                if self._writes % 1000 == 0:
+                    self._prune()
+
+    def _remember(self, key, value, expires_at):
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _prune(self):
+        CacheEntry.delete().where(CacheEntry.expires_at <= time.time()).execute()
+        excess = CacheEntry.select().count() - self.max_shared_entries
+        if excess > 0:
+            oldest = CacheEntry.select(CacheEntry.key).order_by(CacheEntry.expires_at).limit(excess)
+            CacheEntry.delete().where(CacheEntry.key.in_(oldest)).execute()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.shared:
+            with cache_database.connection_context():
+                CacheEntry.delete().execute()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.memory_hits + self.shared_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "memory_hits": self.memory_hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.memory_hits + self.shared_hits) / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,119 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Same palette as the server-rendered charts (Matplotlib's tab20)
+    const palette = [
+        '#1f77b4', '#aec7e8', '#ff7f0e', '#ffbb78', '#2ca02c', '#98df8a', '#d62728', '#ff9896', '#9467bd', '#c5b0d5',
+        '#8c564b', '#c49c94', '#e377c2', '#f7b6d2', '#7f7f7f', '#c7c7c7', '#bcbd22', '#dbdb8d', '#17becf', '#9edae5'
+    ];
+
+    const bankChart = document.getElementById('bank-chart');
+    const investChart = document.getElementById('invest-chart');
+
+    if (bankChart) {
+        loadChartData(bankChart, createBankChart);
+    }
+    if (investChart) {
+        loadChartData(investChart, createInvestChart);
+    }
+
+    function loadChartData(canvas, draw) {
+        fetch(canvas.dataset.src)
+        .then(response => {
+            if (!response.ok) {
+                throw new Error('Failed to load chart data');
+            }
+            return response.json();
+        })
+        .then(data => draw(canvas, data))
+        .catch(error => {
+            console.error('Error:', error);
+            canvas.outerHTML = '<p class="error">Unable to load chart. Please try again.</p>';
+        });
+    }
+
+    function createBankChart(canvas, data) {
+        new Chart(canvas, {
+            type: 'bar',
+            data: {
+                labels: data.banks,
+                datasets: data.series.map((series, i) => ({
+                    label: series.account_type,
+                    data: series.balances,
+                    backgroundColor: palette[i % palette.length]
+                }))
+            },
+            options: {
+                responsive: true,
+                plugins: {
+                    title: {
+                        display: true,
+                        text: 'Bank Account Balances Stacked by Bank'
+                    },
+                    legend: {
+                        title: {
+                            display: true,
+                            text: 'Account Types'
+                        }
+                    },
+                    tooltip: {
+                        callbacks: {
+                            label: context => `${context.dataset.label}: ${formatCurrency(context.parsed.y)}`
+                        }
+                    }
+                },
+                scales: {
+                    x: {
+                        stacked: true
+                    },
+                    y: {
+                        stacked: true,
+                        title: {
+                            display: true,
+                            text: 'Total Balance'
+                        }
+                    }
+                }
+            }
+        });
+    }
+
+    function createInvestChart(canvas, data) {
+        const total = data.amounts.reduce((sum, amount) => sum + amount, 0);
+
+        new Chart(canvas, {
+            type: 'pie',
+            data: {
+                labels: data.invest_types,
+                datasets: [{
+                    data: data.amounts,
+                    backgroundColor: data.amounts.map((_, i) => palette[(i * 2) % palette.length])
+                }]
+            },
+            options: {
+                responsive: true,
+                plugins: {
+                    title: {
+                        display: true,
+                        text: `${data.username} Investment Distribution`
+                    },
+                    tooltip: {
+                        callbacks: {
+                            label: context => {
+                                const share = total ? (context.parsed / total * 100).toFixed(1) : '0.0';
+                                return `${context.label}: ${formatCurrency(context.parsed)} (${share}%)`;
+                            }
+                        }
+                    }
+                }
+            }
+        });
+    }
+
+    function formatCurrency(value) {
+        return new Intl.NumberFormat('en-SG', {
+            style: 'currency',
+            currency: 'SGD',
+            minimumFractionDigits: 2,
+            maximumFractionDigits: 2,
+        }).format(value);
+    }
+});
@@ -29,7 +29,7 @@ document.addEventListener('DOMContentLoaded', function() {
             headers: {
                 'Content-Type': 'application/json',
             },
-            body: JSON.stringify(formData)
+            body: JSON.stringify({...formData, format: 'columnar'})
         })
         .then(response => {
             if (!response.ok) {
@@ -93,10 +93,10 @@ document.addEventListener('DOMContentLoaded', function() {
         const workingPhase = data.working_phase;
         const retirementPhase = data.retirement_phase;
         
-        const labels = [...workingPhase.map(d => d.age), ...retirementPhase.map(d => d.age)];
-        const savingsData = [...workingPhase.map(d => d.savings), ...retirementPhase.map(d => d.savings)];
+        const labels = [...workingPhase.age, ...retirementPhase.age];
+        const savingsData = [...workingPhase.savings, ...retirementPhase.savings];
         
-        const retirementIndex = workingPhase.length - 1;
+        const retirementIndex = workingPhase.age.length - 1;
         
         new Chart(chartCanvas, {
             type: 'line',
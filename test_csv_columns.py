@@ -0,0 +1,44 @@
+import io
+import unittest
+
+import numpy as np
+
+from csv_columns import MAX_CELL_LENGTH, length_errors, read_columns
+
+COLUMNS = ["Bank Account ID", "Date", "Description", "Amount"]
+
+
+def upload(rows):
+    lines = [",".join(COLUMNS)] + [",".join(row) for row in rows]
+    return io.BytesIO("\n".join(lines).encode())
+
+
+class ReadColumnsTest(unittest.TestCase):
+    def test_long_cells_do_not_widen_the_column_arrays(self):
+        # One huge cell used to make every cell of its chunk as wide as itself
+        rows = [["1", "2024-01-01", "shop", "1.50"] for _ in range(1000)]
+        rows[3] = ["1", "2024-01-01", "shop", "9" * 20000]
+        rows[5] = ["1", "2024-01-01", "d" * 100000, "2.00"]
+        _, chunks = read_columns(upload(rows), COLUMNS, text_columns=["Description"])
+        first_row, values, too_long = next(chunks)
+
+        self.assertLessEqual(values["Amount"].dtype.itemsize, MAX_CELL_LENGTH * 4)
+        self.assertEqual(values["Description"].dtype, object)
+        self.assertEqual(len(values["Description"][5]), 100000)
+        self.assertNotIn("Description", too_long)
+        self.assertEqual(np.flatnonzero(too_long["Amount"]).tolist(), [3])
+        self.assertFalse(too_long["Date"].any())
+
+        errors = []
+        rejected = length_errors(errors, first_row, values, too_long)
+        self.assertEqual(np.flatnonzero(rejected).tolist(), [3])
+        self.assertEqual(errors, [{
+            "row": 4,
+            "column": "Amount",
+            "value": "9" * MAX_CELL_LENGTH,
+            "error": f"Must be at most {MAX_CELL_LENGTH} characters",
+        }])
+
+
+if __name__ == "__main__":
+    unittest.main()
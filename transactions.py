@@ -0,0 +1,78 @@
+from datetime import datetime
+
+from peewee import Tuple
+
+from model import DataTransaction
+
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def parse_cursor(cursor):
+    # Cursors are "<date>.<transaction_id>" of the last row of the previous page
+    try:
+        date, transaction_id = cursor.split(".")
+        return datetime.strptime(date, "%Y-%m-%d").date(), int(transaction_id)
+    except ValueError:
+        raise ValueError("Invalid page cursor")
+
+
+def make_cursor(transaction):
+    return f"{transaction.date.isoformat()}.{transaction.transaction_id}"
+
+
+class TransactionPage:
+    """One page of an account's transactions, newest first, using keyset pagination on (date, transaction_id).
+
+    after/before are cursors of the page boundaries, so every page is an index range scan of at most
+    limit + 1 rows however deep it is. Rows are read from the database cursor while the page is iterated,
+    which lets a streamed template send them as they arrive; next_cursor and previous_cursor are known once
+    iteration has finished.
+    """
+
+    def __init__(self, account, after=None, before=None, start=None, end=None, search=None, limit=PAGE_SIZE):
+        self.after = parse_cursor(after) if after else None
+        self.before = parse_cursor(before) if before else None
+        self.limit = limit
+        self.next_cursor = None
+        self.previous_cursor = None
+
+        self.query = DataTransaction.select().where(
+            (DataTransaction.user == account.user_id) & (DataTransaction.bank_account_id == account.id)
+        )
+        if start:
+            self.query = self.query.where(DataTransaction.date >= start)
+        if end:
+            self.query = self.query.where(DataTransaction.date <= end)
+        if search:
+            self.query = self.query.where(DataTransaction.description.contains(search))
+
+    def __iter__(self):
+        key = Tuple(DataTransaction.date, DataTransaction.transaction_id)
+        if self.before:
+            # Walk towards newer rows, then put the page back in newest-first order; this direction
+            # holds the page in memory, which is bounded by the page size
+            query = self.query.where(key > Tuple(*self.before))
+            rows = list(query.order_by(DataTransaction.date, DataTransaction.transaction_id).limit(self.limit + 1))
+            has_more = len(rows) > self.limit
+            rows = rows[:self.limit][::-1]
+            if rows:
+                self.next_cursor = make_cursor(rows[-1])
+                self.previous_cursor = make_cursor(rows[0]) if has_more else None
+            yield from rows
+            return
+
+        query = self.query
+        if self.after:
+            query = query.where(key < Tuple(*self.after))
+        query = query.order_by(DataTransaction.date.desc(), DataTransaction.transaction_id.desc())
+        last = None
+        for i, transaction in enumerate(query.limit(self.limit + 1).iterator()):
+            if i == self.limit:
+                self.next_cursor = make_cursor(last)
+                break
+            if i == 0 and self.after:
+                self.previous_cursor = make_cursor(transaction)
+            last = transaction
+            yield transaction
+
@@ -0,0 +1,192 @@
+import csv
+import io
+from itertools import repeat
+
+import numpy as np
+from peewee import EXCLUDED, chunked
+
+from csv_columns import length_errors, parse_cents, parse_dates, parse_integers, row_errors
+from model import DataInvestment, DataOverview, DataTransaction, database
+
+OVERVIEW_COLUMNS = ["Account ID", "Bank Name", "Bank Name (Short)", "Account Type", "Balance"]
+TRANSACTION_COLUMNS = ["Bank Account ID", "Date", "Description", "Amount"]
+TRANSACTION_TEXT_COLUMNS = ["Description"]
+INVEST_COLUMNS = [
+    "Investment Name",
+    "Ticker Name",
+    "Investment Type",
+    "Price Bought",
+    "Quantity",
+    "Amount Invested",
+    "Investment Date",
+]
+INVEST_TEXT_COLUMNS = ["Investment Name", "Ticker Name", "Investment Type"]
+UPSERT_BATCH_SIZE = 500  # Rows per multi-row INSERT; at most 8 columns each stays under SQLite's variable limit
+
+
+def read_csv(stream):
+    # Rows of an uploaded CSV, decoded and parsed as they are read; a UTF-8 byte order mark is dropped. Werkzeug
+    # spools large uploads to a temporary file, so neither the upload nor the parsed rows are held in memory.
+    return csv.DictReader(io.TextIOWrapper(stream, encoding="utf-8-sig", newline=""), delimiter=",")
+
+
+def upsert_overview(user, lines):
+    # Accounts already uploaded by the user keep their row, and therefore their transactions, and take the new
+    # balance. Call inside a transaction.
+    rows = (
+        {
+            "user": user,
+            "account_id": int(line["Account ID"]),
+            "bank_name": line["Bank Name"],
+            "bank_name_short": line["Bank Name (Short)"],
+            "account_type": line["Account Type"],
+            "balance": float(line["Balance"].replace(",", "")),
+        }
+        for line in lines
+    )
+    count = 0
+    for batch in chunked(rows, UPSERT_BATCH_SIZE):
+        (DataOverview
+         .insert_many(batch)
+         .on_conflict(
+             conflict_target=[DataOverview.user, DataOverview.account_id],
+             update={DataOverview.balance: EXCLUDED.balance},
+         )
+         .execute())
+        count += len(batch)
+    return count
+
+
+def upsert_investments(user, chunks):
+    """Upsert chunks of investment columns from read_columns; call inside a transaction.
+
+    An investment the user already holds, by name, takes the new amount and date. The amount is the price
+    times the quantity, or the amount invested when both are N/A. Rows that fail validation are skipped and
+    reported by row number. Returns the number of rows imported and skipped, and the row errors.
+    """
+    imported = skipped = 0
+    errors = []
+    for first_row, columns, too_long in chunks:
+        # A row with an over-long cell is reported for that alone
+        rejected = length_errors(errors, first_row, columns, too_long)
+        price_na = columns["Price Bought"] == "N/A"
+        quantity_na = columns["Quantity"] == "N/A"
+        price, bad_price = parse_cents(np.where(price_na, "0", columns["Price Bought"]))
+        quantity, bad_quantity = parse_integers(np.where(quantity_na, "0", columns["Quantity"]))
+        invested, bad_invested = parse_cents(columns["Amount Invested"])
+        dates, bad_date = parse_dates(columns["Investment Date"])
+
+        priced = ~price_na & ~quantity_na
+        partial = (price_na != quantity_na) & ~rejected
+        bad_price &= ~rejected
+        bad_quantity &= ~rejected
+        bad_invested &= ~priced & ~rejected
+        bad_date &= ~rejected
+        row_errors(errors, first_row, bad_price, "Price Bought", columns["Price Bought"], "Must be a number or N/A")
+        row_errors(errors, first_row, bad_quantity, "Quantity", columns["Quantity"], "Must be a whole number or N/A")
+        row_errors(errors, first_row, partial, "Quantity", columns["Quantity"],
+                   "Price Bought and Quantity must both be given or both be N/A")
+        row_errors(errors, first_row, bad_invested, "Amount Invested", columns["Amount Invested"], "Must be a number")
+        row_errors(errors, first_row, bad_date, "Investment Date", columns["Investment Date"], "Must be YYYY-MM-DD")
+
+        valid = ~(rejected | bad_price | bad_quantity | partial | bad_invested | bad_date)
+        amount = np.where(priced, price * quantity, invested)[valid] / 100
+        price = np.where(priced, price / 100, np.nan)[valid]
+        rows = [
+            {
+                "user": user,
+                "name": name,
+                "ticker": ticker,
+                "invest_type": invest_type,
+                "price": None if np.isnan(price[i]) else float(price[i]),
+                "quantity": int(quantity[i]) if has_quantity else None,
+                "amount": float(amount[i]),
+                "date": date,
+            }
+            for i, (name, ticker, invest_type, has_quantity, date) in enumerate(zip(
+                columns["Investment Name"][valid].tolist(),
+                columns["Ticker Name"][valid].tolist(),
+                columns["Investment Type"][valid].tolist(),
+                priced[valid].tolist(),
+                np.datetime_as_string(dates[valid]).tolist(),
+            ))
+        ]
+        for batch in chunked(rows, UPSERT_BATCH_SIZE):
+            (DataInvestment
+             .insert_many(batch)
+             .on_conflict(
+                 conflict_target=[DataInvestment.user, DataInvestment.name],
+                 update={DataInvestment.amount: EXCLUDED.amount, DataInvestment.date: EXCLUDED.date},
+             )
+             .execute())
+        imported += len(rows)
+        skipped += len(valid) - len(rows)
+    return {"imported": imported, "skipped": skipped, "errors": sorted(errors, key=lambda error: error["row"])}
+
+
+def import_transactions(user, chunks):
+    """Insert chunks of transaction columns from read_columns for a user, inside a single transaction.
+
+    The user's account ids are resolved once up front, and each chunk is validated a column at a time. Rows
+    for accounts the user has not uploaded, or with an invalid account id, date or amount, are skipped and
+    reported by row number. Valid rows are written by running one prepared INSERT with executemany, which
+    avoids building the SQL for every value. Returns the number of rows inserted and skipped, the account ids
+    that were not found and the row errors.
+    """
+    insert_sql, _ = DataTransaction.insert({
+        DataTransaction.user: None,
+        DataTransaction.bank_account_id: None,
+        DataTransaction.date: None,
+        DataTransaction.description: None,
+        DataTransaction.amount: None,
+    }).sql()
+    accounts = (DataOverview
+                .select(DataOverview.account_id, DataOverview.id)
+                .where(DataOverview.user == user)
+                .order_by(DataOverview.account_id)
+                .tuples())
+    known_ids = np.array([account_id for account_id, _ in accounts], dtype=np.int64)
+    account_rows = np.array([row_id for _, row_id in accounts], dtype=np.int64)
+    counts = {"inserted": 0, "skipped": 0}
+    unknown_accounts = set()
+    errors = []
+
+    with database.atomic():
+        cursor = database.cursor()
+        for first_row, columns, too_long in chunks:
+            # A row with an over-long cell is reported for that alone
+            rejected = length_errors(errors, first_row, columns, too_long)
+            account_ids, bad_account = parse_integers(columns["Bank Account ID"])
+            dates, bad_date = parse_dates(columns["Date"])
+            cents, bad_amount = parse_cents(columns["Amount"])
+            bad_account &= ~rejected
+            bad_date &= ~rejected
+            bad_amount &= ~rejected
+
+            position = np.searchsorted(known_ids, account_ids).clip(0, max(len(known_ids) - 1, 0))
+            found = ~bad_account & ~rejected & (known_ids[position] == account_ids if len(known_ids) else False)
+            unknown = ~bad_account & ~rejected & ~found
+            unknown_accounts.update(account_ids[unknown].tolist())
+            row_errors(errors, first_row, bad_account, "Bank Account ID", columns["Bank Account ID"],
+                       "Must be a whole number")
+            row_errors(errors, first_row, unknown, "Bank Account ID", columns["Bank Account ID"],
+                       "Account does not exist in DataOverview")
+            row_errors(errors, first_row, bad_date, "Date", columns["Date"], "Must be YYYY-MM-DD")
+            row_errors(errors, first_row, bad_amount, "Amount", columns["Amount"], "Must be a number")
+
+            valid = found & ~bad_date & ~bad_amount
+            cursor.executemany(insert_sql, zip(
+                repeat(user.id),
+                account_rows[position[valid]].tolist(),
+                np.datetime_as_string(dates[valid]).tolist(),
+                columns["Description"][valid].tolist(),
+                (cents[valid] / 100).tolist(),
+            ))
+            inserted = int(valid.sum())
+            counts["inserted"] += inserted
+            counts["skipped"] += len(valid) - inserted
+    return {
+        **counts,
+        "unknown_accounts": sorted(unknown_accounts),
+        "errors": sorted(errors, key=lambda error: error["row"]),
+    }